@@ -8,15 +8,40 @@ Handles:
 """
 
 import asyncio
+import collections
+import random
+import threading
 import time
 import logging
-from typing import Callable, Any, Optional
-from functools import wraps
+from typing import Callable, Any, Dict, Optional
+from functools import lru_cache, wraps
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=512)
+def _is_coroutine_function(func: Callable) -> bool:
+    """Memoized asyncio.iscoroutinefunction to avoid per-call inspect overhead."""
+    return asyncio.iscoroutinefunction(func)
+
+
+def _known_rate_limit_error_types() -> tuple:
+    """Collect SDK-specific rate-limit exception classes available at import time."""
+    types = []
+    try:
+        import openai
+        types.append(openai.RateLimitError)
+    except (ImportError, AttributeError):
+        pass
+    return tuple(types)
+
+
+# Computed once: isinstance against these is much cheaper (and more precise)
+# than scanning str(error) for substrings.
+_RATE_LIMIT_ERROR_TYPES = _known_rate_limit_error_types()
+
+
 class APIRateLimiter:
     """
     Rate limiter for LLM API calls to prevent 429 (Too Many Requests) errors.
@@ -35,6 +60,9 @@ class APIRateLimiter:
         initial_backoff: float = 1.0,
         max_backoff: float = 60.0,
         backoff_multiplier: float = 2.0,
+        rate_increase_delta: float = 0.05,
+        rate_decrease_factor: float = 0.5,
+        min_rate: float = 0.1,
     ):
         """
         Initialize API Rate Limiter.
@@ -46,13 +74,39 @@ class APIRateLimiter:
             initial_backoff: Initial backoff time in seconds (default: 1.0)
             max_backoff: Maximum backoff time in seconds (default: 60.0)
             backoff_multiplier: Backoff multiplier for exponential backoff (default: 2.0)
+            rate_increase_delta: Additive refill-rate increase (req/sec) per successful call
+            rate_decrease_factor: Multiplicative refill-rate decrease on 429 errors
+            min_rate: Floor for the adaptive refill rate (req/sec)
         """
         self.requests_per_minute = requests_per_minute
         self.requests_per_second = requests_per_second
         
-        # Token bucket: track request timestamps
-        self.request_timestamps: list = []
+        # Token bucket refilled on a monotonic clock. The lock only guards
+        # bucket updates; sleeps happen outside it so concurrent callers are
+        # not serialized behind a single sleeper.
+        self.rate = requests_per_minute / 60.0
+        # Adaptive feedback: the configured rate is the ceiling; observed 429s
+        # shrink the refill rate multiplicatively, successes grow it back
+        # additively (AIMD), so we converge near the true server limit.
+        self.max_rate = self.rate
+        self.min_rate = min_rate
+        self.rate_increase_delta = rate_increase_delta
+        self.rate_decrease_factor = rate_decrease_factor
+        # Recent outcome samples (True = success, False = 429) for telemetry
+        self.congestion_samples: collections.deque = collections.deque(maxlen=100)
+        self.capacity = float(requests_per_minute)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        # Optional second bucket for the per-second limit
+        if requests_per_second is not None:
+            self.second_tokens = float(requests_per_second)
+            self.second_last_refill = self.last_refill
         self.lock = asyncio.Lock()
+        # Guards all bucket and rate state. Both the sync and async paths
+        # take it around every read-modify-write, since sync callers on
+        # worker threads run concurrently with async ones (the asyncio
+        # lock only serializes coroutines within one event loop).
+        self.sync_lock = threading.Lock()
         
         # Retry configuration
         self.max_retries = max_retries
@@ -65,54 +119,107 @@ class APIRateLimiter:
             f"{requests_per_second} req/sec (if set), max_retries={max_retries}"
         )
     
+    def _try_take(self) -> float:
+        """
+        Refill the buckets and try to take one token. Returns 0.0 on
+        success, otherwise the seconds to wait before retrying. Callers
+        must hold sync_lock.
+        """
+        now = time.monotonic()
+
+        # Refill the per-minute bucket
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+        if self.tokens < 1.0:
+            wait_time = (1.0 - self.tokens) / self.rate
+            logger.warning(
+                f"[RATE_LIMITER] Rate limit reached ({self.requests_per_minute} req/min), "
+                f"waiting {wait_time:.2f}s"
+            )
+            return wait_time
+
+        # Refill and check the per-second bucket if set
+        wait_time = 0.0
+        if self.requests_per_second is not None:
+            self.second_tokens = min(
+                float(self.requests_per_second),
+                self.second_tokens + (now - self.second_last_refill) * self.requests_per_second,
+            )
+            self.second_last_refill = now
+            if self.second_tokens < 1.0:
+                wait_time = (1.0 - self.second_tokens) / self.requests_per_second
+
+        if wait_time <= 0.0:
+            self.tokens -= 1.0
+            if self.requests_per_second is not None:
+                self.second_tokens -= 1.0
+            return 0.0
+        return wait_time
+
     async def acquire(self):
         """
         Acquire permission to make an API request (rate limiting).
         Blocks if rate limit would be exceeded.
+
+        The internal lock is only held while updating the buckets, never
+        across a sleep, so waiting callers do not serialize each other; each
+        loop iteration re-validates against a freshly refilled bucket.
         """
-        async with self.lock:
-            now = time.time()
-            
-            # Clean old timestamps (older than 1 minute)
-            self.request_timestamps = [
-                ts for ts in self.request_timestamps
-                if now - ts < 60.0
-            ]
-            
-            # Check per-minute limit
-            if len(self.request_timestamps) >= self.requests_per_minute:
-                # Calculate wait time until oldest request expires
-                oldest_ts = min(self.request_timestamps)
-                wait_time = 60.0 - (now - oldest_ts) + 0.1  # Add small buffer
-                if wait_time > 0:
-                    logger.warning(
-                        f"[RATE_LIMITER] Rate limit reached ({len(self.request_timestamps)}/{self.requests_per_minute}), "
-                        f"waiting {wait_time:.2f}s"
-                    )
-                    await asyncio.sleep(wait_time)
-                    # Re-clean after waiting
-                    now = time.time()
-                    self.request_timestamps = [
-                        ts for ts in self.request_timestamps
-                        if now - ts < 60.0
-                    ]
-            
-            # Check per-second limit if set
-            if self.requests_per_second is not None:
-                recent_requests = [
-                    ts for ts in self.request_timestamps
-                    if now - ts < 1.0
-                ]
-                if len(recent_requests) >= self.requests_per_second:
-                    # Wait until oldest request in this second expires
-                    oldest_ts = min(recent_requests)
-                    wait_time = 1.0 - (now - oldest_ts) + 0.01  # Add small buffer
-                    if wait_time > 0:
-                        await asyncio.sleep(wait_time)
-            
-            # Record this request
-            self.request_timestamps.append(time.time())
-    
+        while True:
+            async with self.lock:
+                # The thread lock is what actually protects the bucket
+                # state against sync callers; it is only held across the
+                # bucket math, never a sleep, so this cannot block the
+                # loop for long.
+                with self.sync_lock:
+                    wait_time = self._try_take()
+                if wait_time <= 0.0:
+                    return
+            # Sleep outside the lock so other callers can refill/acquire
+            await asyncio.sleep(wait_time)
+
+    def acquire_sync(self):
+        """
+        Synchronous acquire() for callers without an event loop: same
+        token buckets and lock, blocking with time.sleep instead of
+        awaiting.
+        """
+        while True:
+            with self.sync_lock:
+                wait_time = self._try_take()
+                if wait_time <= 0.0:
+                    return
+            time.sleep(wait_time)
+
+    def _increase_rate(self):
+        """Additively grow the refill rate after a successful call (capped at the configured rate)."""
+        with self.sync_lock:
+            self.rate = min(self.max_rate, self.rate + self.rate_increase_delta)
+            self.congestion_samples.append(True)
+
+    def _decrease_rate(self):
+        """Multiplicatively shrink the refill rate after a 429 and drain the bucket."""
+        with self.sync_lock:
+            old_rate = self.rate
+            self.rate = max(self.min_rate, self.rate * self.rate_decrease_factor)
+            self.tokens = 0.0
+            self.congestion_samples.append(False)
+        logger.warning(
+            f"[RATE_LIMITER] 429 observed, reducing rate {old_rate * 60:.1f} -> {self.rate * 60:.1f} req/min"
+        )
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return current adaptive rate (req/min) and recent success ratio."""
+        samples = len(self.congestion_samples)
+        successes = sum(1 for s in self.congestion_samples if s)
+        return {
+            "current_rate_per_minute": self.rate * 60.0,
+            "max_rate_per_minute": self.max_rate * 60.0,
+            "success_ratio": (successes / samples) if samples else 1.0,
+            "samples": samples,
+        }
+
     def is_rate_limit_error(self, error: Exception) -> bool:
         """
         Check if an error is a rate limit error (429).
@@ -123,23 +230,41 @@ class APIRateLimiter:
         Returns:
             True if error is a rate limit error
         """
+        # Fast, precise path: known SDK exception classes
+        if _RATE_LIMIT_ERROR_TYPES and isinstance(error, _RATE_LIMIT_ERROR_TYPES):
+            return True
+
+        # Check for a 429 status code on the error or its response
+        if getattr(error, 'status_code', None) == 429:
+            return True
+        if getattr(getattr(error, 'response', None), 'status_code', None) == 429:
+            return True
+
+        # Last resort: substring scan for errors from unknown SDKs
         error_str = str(error).lower()
-        error_type = type(error).__name__
-        
-        # Check for 429 status code
         if "429" in error_str or "rate limit" in error_str or "too many requests" in error_str:
             return True
-        
-        # Check for OpenAI/OpenAI-compatible API rate limit errors
-        if hasattr(error, 'status_code') and error.status_code == 429:
-            return True
-        
-        if hasattr(error, 'response'):
-            if hasattr(error.response, 'status_code') and error.response.status_code == 429:
-                return True
-        
+
         return False
-    
+
+    @staticmethod
+    def _retry_after_seconds(error: Exception) -> Optional[float]:
+        """Extract a Retry-After hint (in seconds) from the error's response, if present."""
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+        if not headers:
+            return None
+        try:
+            value = headers.get('Retry-After')
+        except AttributeError:
+            return None
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
     async def call_with_retry(
         self,
         func: Callable,
@@ -168,26 +293,81 @@ class APIRateLimiter:
                 await self.acquire()
                 
                 # Call the function
-                if asyncio.iscoroutinefunction(func):
+                if _is_coroutine_function(func):
                     result = await func(*args, **kwargs)
                 else:
                     result = func(*args, **kwargs)
                 
-                # Success - reset backoff for next potential error
+                # Success - grow the adaptive rate back toward the ceiling
+                self._increase_rate()
                 if attempt > 0:
                     logger.info(f"[RATE_LIMITER] Request succeeded after {attempt} retries")
                 return result
-                
+
             except Exception as e:
                 # Check if it's a rate limit error
-                if self.is_rate_limit_error(e) and attempt < self.max_retries:
-                    wait_time = min(backoff, self.max_backoff)
+                is_rate_limited = self.is_rate_limit_error(e)
+                if is_rate_limited:
+                    self._decrease_rate()
+                if is_rate_limited and attempt < self.max_retries:
+                    # Randomized jitter avoids synchronized retry storms when
+                    # several workers hit the limit at the same instant.
+                    wait_time = random.uniform(
+                        self.initial_backoff, min(self.max_backoff, backoff)
+                    )
+                    # Honor the server's Retry-After hint when present
+                    retry_after = self._retry_after_seconds(e)
+                    if retry_after is not None:
+                        wait_time = max(wait_time, retry_after)
                     logger.warning(
                         f"[RATE_LIMITER] Rate limit error (attempt {attempt + 1}/{self.max_retries + 1}): {str(e)}. "
                         f"Retrying after {wait_time:.2f}s"
                     )
                     await asyncio.sleep(wait_time)
-                    backoff *= self.backoff_multiplier
+                    backoff = min(self.max_backoff, backoff * self.backoff_multiplier)
+                    continue
+                else:
+                    # Not a rate limit error, or max retries reached
+                    raise
+
+    def call_with_retry_sync(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Synchronous call_with_retry for plain (non-async) callables.
+
+        Bypasses asyncio entirely — no event loop, coroutine frame or
+        executor hand-off per call — which matters for the synchronous
+        LangChain agents where every LLM invocation passes through here.
+        """
+        backoff = self.initial_backoff
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.acquire_sync()
+                result = func(*args, **kwargs)
+
+                # Success - grow the adaptive rate back toward the ceiling
+                self._increase_rate()
+                if attempt > 0:
+                    logger.info(f"[RATE_LIMITER] Request succeeded after {attempt} retries")
+                return result
+
+            except Exception as e:
+                is_rate_limited = self.is_rate_limit_error(e)
+                if is_rate_limited:
+                    self._decrease_rate()
+                if is_rate_limited and attempt < self.max_retries:
+                    wait_time = random.uniform(
+                        self.initial_backoff, min(self.max_backoff, backoff)
+                    )
+                    retry_after = self._retry_after_seconds(e)
+                    if retry_after is not None:
+                        wait_time = max(wait_time, retry_after)
+                    logger.warning(
+                        f"[RATE_LIMITER] Rate limit error (attempt {attempt + 1}/{self.max_retries + 1}): {str(e)}. "
+                        f"Retrying after {wait_time:.2f}s"
+                    )
+                    time.sleep(wait_time)
+                    backoff = min(self.max_backoff, backoff * self.backoff_multiplier)
                     continue
                 else:
                     # Not a rate limit error, or max retries reached
@@ -218,6 +398,9 @@ def with_rate_limit(func: Callable) -> Callable:
         async def my_api_call(...):
             ...
     """
+    # Classify once at decoration time instead of on every call
+    is_coro = asyncio.iscoroutinefunction(func)
+
     @wraps(func)
     async def wrapper(*args, **kwargs):
         limiter = get_rate_limiter()
@@ -225,10 +408,10 @@ def with_rate_limit(func: Callable) -> Callable:
             return await limiter.call_with_retry(func, *args, **kwargs)
         else:
             # No rate limiter configured, call directly
-            if asyncio.iscoroutinefunction(func):
+            if is_coro:
                 return await func(*args, **kwargs)
             else:
                 return func(*args, **kwargs)
-    
+
     return wrapper
 
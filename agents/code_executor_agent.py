@@ -2,14 +2,78 @@
 CodeExecutorAgent: Compiles and executes generated Java initialization code.
 """
 
+import asyncio
+import hashlib
 import os
 import re
 import json
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import Future
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 
-from config import CLASS_PATH
+from config import CLASS_PATH, JAVA_UTILS_PATH
+
+# orjson parses typical initializer objects several times faster than the
+# stdlib; fall back silently when it is not installed. Both decoders raise
+# ValueError subclasses on bad input.
+try:
+    import orjson
+    _fast_loads = orjson.loads
+except ImportError:
+    _fast_loads = json.loads
+
+# Precompiled once at import: matches `public class X`, including the common
+# modifiers that may sit between `public` and `class`.
+_PUBLIC_CLASS_RE = re.compile(r"public\s+(?:final\s+|abstract\s+|sealed\s+)?class\s+(\w+)")
+
+# On-disk cache of successful execution results, keyed by a hash of
+# (java_code, classpath). Orchestrator retries often re-submit identical
+# code, so hits skip the whole compile+run pipeline.
+_RESULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "llm-hlcs")
+_RESULT_CACHE_MAX_ENTRIES = 256
+
+# Default JVM flags for the short-lived `java` run: the snippet just emits
+# JSON and exits, so C2 compilation never pays off and SerialGC avoids GC
+# thread startup. Not applied to the long-lived daemon JVM.
+_JAVA_FAST_START_FLAGS = ["-XX:TieredStopAtLevel=1", "-XX:+UseSerialGC", "-Xshare:auto"]
+
+# javac-style diagnostics (`Foo.java:12: error: ...`) on source-mode stderr
+# indicate a compile-time failure rather than a runtime one.
+_COMPILE_ERROR_MARKER_RE = re.compile(r"\.java:\d+:\s*(?:error|warning):")
+
+# Version lines look like `openjdk version "17.0.2"` or `java version "1.8.0_292"`
+_JAVA_VERSION_RE = re.compile(r'version "(\d+)(?:\.(\d+))?')
+
+
+@lru_cache(maxsize=128)
+def _detect_public_class_name_cached(java_code: str) -> Optional[str]:
+    """Memoized public-class detection; retry loops re-submit identical sources."""
+    m = _PUBLIC_CLASS_RE.search(java_code)
+    if m:
+        return m.group(1)
+    return None
+
+
+@lru_cache(maxsize=8)
+def _detect_jdk_major(java_exe: str) -> int:
+    """Detect the JDK major version for a java executable (0 if undetectable)."""
+    try:
+        proc = subprocess.run(
+            [java_exe, "-version"], capture_output=True, text=True, timeout=10
+        )
+    except Exception:
+        return 0
+    m = _JAVA_VERSION_RE.search(proc.stderr or proc.stdout or "")
+    if not m:
+        return 0
+    major = int(m.group(1))
+    # Pre-JDK9 versions report as 1.x
+    if major == 1 and m.group(2):
+        major = int(m.group(2))
+    return major
 
 
 class CodeExecutorAgent:
@@ -18,17 +82,47 @@ class CodeExecutorAgent:
     JSON output from stdout.
     """
 
-    def __init__(self, classpath: str = "", jdk_home: Optional[str] = None):
+    def __init__(
+        self,
+        classpath: str = "",
+        jdk_home: Optional[str] = None,
+        java_flags: Optional[List[str]] = None,
+    ):
         """
         Initialize the code executor.
 
         Args:
             classpath: Classpath to use for compilation and execution (colon-separated on Linux).
             jdk_home: Optional path to JDK installation (defaults to JAVA_HOME or system java).
+            java_flags: JVM flags for the short-lived run (defaults to fast-start flags;
+                pass [] to disable them if they cause issues on a given JDK).
         """
         # If not provided, fall back to CLASS_PATH from config (comma-separated), normalized for OS
         self.classpath = classpath or self._normalize_classpath(CLASS_PATH)
         self.jdk_home = jdk_home or os.environ.get("JAVA_HOME", "")
+        self.java_flags = _JAVA_FAST_START_FLAGS if java_flags is None else java_flags
+
+        # Resolve the executables once: jdk_home is fixed for the agent's
+        # lifetime, so there is no reason to re-join paths per call.
+        self.javac = self._get_java_executable("javac")
+        self.java = self._get_java_executable("java")
+
+        # Persistent worker JVM (CodeExecutorDaemon): spawned lazily on first
+        # use and reused across calls to avoid two JVM cold starts per snippet.
+        # Falls back to the subprocess path if the daemon is unavailable.
+        self._daemon_jar = os.path.join(JAVA_UTILS_PATH, 'target', 'javautils-cli.jar')
+        self._daemon_proc: Optional[subprocess.Popen] = None
+        self._daemon_lock = threading.Lock()
+        self._daemon_disabled = not os.path.exists(self._daemon_jar)
+
+        # In-flight futures map: concurrent identical executions share one result
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        # Bound for concurrently running JVMs in acompile_and_execute.
+        # The semaphore is created lazily so it binds to the caller's loop.
+        self.max_parallel_jvms = min(os.cpu_count() or 1, 4)
+        self._async_sem: Optional[asyncio.Semaphore] = None
 
     def _get_java_executable(self, tool: str) -> str:
         """Get the path to javac or java executable."""
@@ -36,6 +130,174 @@ class CodeExecutorAgent:
             return os.path.join(self.jdk_home, "bin", tool)
         return tool  # Assume it's in PATH
 
+    def _result_cache_key(self, java_code: str) -> str:
+        """Hash (java_code, classpath) into a stable cache key."""
+        payload = java_code + "\x00" + self.classpath
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _load_cached_result(key: str) -> Optional[Dict[str, Any]]:
+        """Load a previously cached execution result, or None on miss/corruption."""
+        path = os.path.join(_RESULT_CACHE_DIR, f"{key}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            # Touch for LRU eviction ordering
+            os.utime(path, None)
+            return cached if isinstance(cached, dict) else None
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _store_cached_result(key: str, result: Dict[str, Any]):
+        """Persist a successful execution result; evict oldest entries beyond the cap."""
+        try:
+            os.makedirs(_RESULT_CACHE_DIR, exist_ok=True)
+            path = os.path.join(_RESULT_CACHE_DIR, f"{key}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+
+            entries = [
+                os.path.join(_RESULT_CACHE_DIR, name)
+                for name in os.listdir(_RESULT_CACHE_DIR)
+                if name.endswith(".json")
+            ]
+            if len(entries) > _RESULT_CACHE_MAX_ENTRIES:
+                entries.sort(key=os.path.getmtime)
+                for stale in entries[:len(entries) - _RESULT_CACHE_MAX_ENTRIES]:
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+        except OSError:
+            # Cache is best-effort; never fail the execution because of it
+            pass
+
+    def _ensure_daemon(self) -> Optional[subprocess.Popen]:
+        """Spawn (or return the already-running) worker JVM. Caller must hold _daemon_lock."""
+        if self._daemon_disabled:
+            return None
+        if self._daemon_proc is not None and self._daemon_proc.poll() is None:
+            return self._daemon_proc
+        daemon_cp = self._daemon_jar
+        if self.classpath:
+            daemon_cp = f"{daemon_cp}{os.pathsep}{self.classpath}"
+        try:
+            self._daemon_proc = subprocess.Popen(
+                [self.java, "-cp", daemon_cp, "javaUtils.CodeExecutorDaemon"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except Exception:
+            self._daemon_proc = None
+            self._daemon_disabled = True
+            return None
+        return self._daemon_proc
+
+    def _shutdown_daemon(self):
+        """Kill the worker JVM (e.g., after a protocol error or timeout). Caller must hold _daemon_lock."""
+        if self._daemon_proc is not None:
+            try:
+                self._daemon_proc.kill()
+            except Exception:
+                pass
+            self._daemon_proc = None
+
+    def _execute_via_daemon(
+        self, java_code: str, class_name: str, timeout: float = 30.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Compile and run the snippet inside the persistent worker JVM.
+
+        Protocol (length-prefixed frames, see CodeExecutorDaemon.java):
+            Request:  <className>\\n<sourceByteLength>\\n<sourceBytes>
+            Reply:    <status>\\n<len>\\n<stdout><len>\\n<stderr>
+
+        Returns a result dict on success, or None to signal the caller to
+        fall back to the subprocess path.
+        """
+        with self._daemon_lock:
+            proc = self._ensure_daemon()
+            if proc is None:
+                return None
+
+            # Watchdog: kill the daemon if the snippet hangs; the blocked
+            # reads below then fail and we fall back to the subprocess path.
+            watchdog = threading.Timer(timeout, proc.kill)
+            watchdog.start()
+            try:
+                source = java_code.encode("utf-8")
+                proc.stdin.write(f"{class_name}\n{len(source)}\n".encode("utf-8"))
+                proc.stdin.write(source)
+                proc.stdin.flush()
+
+                status = self._read_daemon_line(proc)
+                stdout = self._read_daemon_frame(proc)
+                stderr = self._read_daemon_frame(proc)
+            except Exception:
+                self._shutdown_daemon()
+                return None
+            finally:
+                watchdog.cancel()
+
+            if status is None or stdout is None or stderr is None:
+                self._shutdown_daemon()
+                return None
+
+        result = {
+            "success": False,
+            "objects": [],
+            "compile_output": "",
+            "run_output": "",
+            "run_error": "",
+            "error": "",
+        }
+        if status == "OK":
+            result["run_output"] = stdout
+            result["run_error"] = stderr
+            result["objects"] = self._extract_json_objects(stdout)
+            result["success"] = True
+        elif status == "COMPILE_ERROR":
+            result["compile_output"] = stderr
+            result["error"] = f"Compilation failed: {stderr}"
+        elif status == "RUNTIME_ERROR":
+            result["run_output"] = stdout
+            result["run_error"] = stderr
+            result["error"] = f"Execution failed: {stderr}"
+        else:
+            # Unknown status: treat the daemon as broken and fall back
+            with self._daemon_lock:
+                self._shutdown_daemon()
+            return None
+        return result
+
+    @staticmethod
+    def _read_daemon_line(proc: subprocess.Popen) -> Optional[str]:
+        """Read one newline-terminated field from the daemon's stdout."""
+        line = proc.stdout.readline()
+        if not line:
+            return None
+        return line.decode("utf-8").rstrip("\n")
+
+    @classmethod
+    def _read_daemon_frame(cls, proc: subprocess.Popen) -> Optional[str]:
+        """Read one length-prefixed payload from the daemon's stdout."""
+        length_line = cls._read_daemon_line(proc)
+        if length_line is None:
+            return None
+        try:
+            length = int(length_line)
+        except ValueError:
+            return None
+        payload = b""
+        while len(payload) < length:
+            chunk = proc.stdout.read(length - len(payload))
+            if not chunk:
+                return None
+            payload += chunk
+        return payload.decode("utf-8", errors="replace")
+
     def compile_and_execute(
         self, java_code: str, class_name: str = "InitializerMain"
     ) -> Dict[str, Any]:
@@ -55,6 +317,66 @@ class CodeExecutorAgent:
                 - run_error: str (stderr from java)
                 - error: str (error message if any)
         """
+        # If the code declares a public class, use that as the filename/entrypoint
+        detected_class = self._detect_public_class_name(java_code)
+        if detected_class:
+            class_name = detected_class
+
+        # Fastest path: identical code was already executed successfully
+        cache_key = self._result_cache_key(java_code)
+        cached = self._load_cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        # In-flight deduplication: if another thread is already executing the
+        # same code, wait for its result instead of spawning a second pipeline.
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            if future is None:
+                future = Future()
+                self._inflight[cache_key] = future
+                is_owner = True
+            else:
+                is_owner = False
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = self._compile_and_execute_impl(java_code, class_name, cache_key)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+
+    async def acompile_and_execute(
+        self, java_code: str, class_name: str = "InitializerMain"
+    ) -> Dict[str, Any]:
+        """
+        Async variant of compile_and_execute for independent, parallel runs.
+
+        At most max_parallel_jvms executions run concurrently; each one goes
+        through the synchronous pipeline in a worker thread, so the result
+        cache, in-flight dedup, and daemon fast path all still apply.
+
+        Usage:
+            results = await asyncio.gather(
+                *[agent.acompile_and_execute(code) for code in batch]
+            )
+        """
+        if self._async_sem is None:
+            self._async_sem = asyncio.Semaphore(self.max_parallel_jvms)
+        async with self._async_sem:
+            return await asyncio.to_thread(self.compile_and_execute, java_code, class_name)
+
+    def _compile_and_execute_impl(
+        self, java_code: str, class_name: str, cache_key: str
+    ) -> Dict[str, Any]:
+        """Do the actual compile+run work for a single (deduplicated) caller."""
         result = {
             "success": False,
             "objects": [],
@@ -64,13 +386,16 @@ class CodeExecutorAgent:
             "error": "",
         }
 
+        # Fast path: run inside the persistent worker JVM (no cold starts).
+        # Returns None if the daemon is unavailable or misbehaves.
+        daemon_result = self._execute_via_daemon(java_code, class_name)
+        if daemon_result is not None:
+            if daemon_result.get("success"):
+                self._store_cached_result(cache_key, daemon_result)
+            return daemon_result
+
         # Create a temporary directory for the Java file
         with tempfile.TemporaryDirectory() as tmpdir:
-            # If the code declares a public class, use that as the filename/entrypoint
-            detected_class = self._detect_public_class_name(java_code)
-            if detected_class:
-                class_name = detected_class
-
             # Write the Java code to a file
             java_file = os.path.join(tmpdir, f"{class_name}.java")
             try:
@@ -80,67 +405,136 @@ class CodeExecutorAgent:
                 result["error"] = f"Failed to write Java file: {e}"
                 return result
 
-            # Compile the Java code
-            javac_cmd = [self._get_java_executable("javac")]
-            if self.classpath:
-                javac_cmd.extend(["-cp", self.classpath])
-            javac_cmd.append(java_file)
+            # JDK 11+ source-file mode compiles and runs in one JVM, halving
+            # startup cost; older JDKs keep the two-step javac + java path.
+            use_source_mode = _detect_jdk_major(self.java) >= 11
 
-            try:
-                compile_proc = subprocess.run(
-                    javac_cmd,
-                    cwd=tmpdir,
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                )
-                result["compile_output"] = compile_proc.stdout + compile_proc.stderr
+            if not use_source_mode:
+                # Compile the Java code. The snippet is ephemeral, so skip
+                # annotation processing, implicit class compilation, debug info,
+                # and lint — all pure overhead here.
+                javac_cmd = [
+                    self.javac,
+                    "-proc:none",
+                    "-implicit:none",
+                    "-g:none",
+                    "-nowarn",
+                    "-Xlint:none",
+                ]
+                if self.classpath:
+                    javac_cmd.extend(["-cp", self.classpath])
+                javac_cmd.append(java_file)
 
-                if compile_proc.returncode != 0:
-                    result["error"] = f"Compilation failed: {result['compile_output']}"
+                try:
+                    # Binary mode: javac emits UTF-8, and decoding through the
+                    # locale codec (text=True) mangles diagnostics on some
+                    # platforms. Decode explicitly, and only when it failed.
+                    compile_proc = subprocess.run(
+                        javac_cmd,
+                        cwd=tmpdir,
+                        capture_output=True,
+                        timeout=30,
+                    )
+
+                    if compile_proc.returncode != 0:
+                        result["compile_output"] = (
+                            compile_proc.stdout + compile_proc.stderr
+                        ).decode("utf-8", errors="replace")
+                        result["error"] = f"Compilation failed: {result['compile_output']}"
+                        return result
+                except subprocess.TimeoutExpired:
+                    result["error"] = "Compilation timed out"
+                    return result
+                except Exception as e:
+                    result["error"] = f"Compilation error: {e}"
                     return result
-            except subprocess.TimeoutExpired:
-                result["error"] = "Compilation timed out"
-                return result
-            except Exception as e:
-                result["error"] = f"Compilation error: {e}"
-                return result
 
-            # Run the compiled Java code
-            java_cmd = [self._get_java_executable("java")]
-            if self.classpath:
+            # Run the Java code (source file directly in source mode,
+            # compiled class otherwise)
+            java_cmd = [self.java]
+            java_cmd.extend(self.java_flags)
+            if use_source_mode:
+                if self.classpath:
+                    java_cmd.extend(["-cp", self.classpath])
+                java_cmd.append(java_file)
+            elif self.classpath:
                 # Include both the classpath and the tmpdir for the compiled class
                 combined_cp = f"{tmpdir}{os.pathsep}{self.classpath}"
                 java_cmd.extend(["-cp", combined_cp])
+                java_cmd.append(class_name)
             else:
                 java_cmd.extend(["-cp", tmpdir])
-            java_cmd.append(class_name)
+                java_cmd.append(class_name)
 
             try:
-                run_proc = subprocess.run(
+                # Binary pipes: stdout is decoded as UTF-8 per line, stderr
+                # only on failure, instead of going through the locale codec.
+                run_proc = subprocess.Popen(
                     java_cmd,
                     cwd=tmpdir,
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
                 )
-                result["run_output"] = run_proc.stdout
-                result["run_error"] = run_proc.stderr
 
-                if run_proc.returncode != 0:
-                    result["error"] = f"Execution failed (exit code {run_proc.returncode}): {result['run_error']}"
+                # Drain stderr on a side thread so the child never blocks on a
+                # full stderr pipe while we consume stdout.
+                stderr_chunks: List[bytes] = []
+                stderr_thread = threading.Thread(
+                    target=lambda: stderr_chunks.append(run_proc.stderr.read()),
+                    daemon=True,
+                )
+                stderr_thread.start()
+
+                # Watchdog enforces the timeout; the stdout iteration below
+                # then ends and wait() returns the kill exit code.
+                timed_out = [False]
+
+                def _kill_on_timeout():
+                    timed_out[0] = True
+                    run_proc.kill()
+
+                watchdog = threading.Timer(30.0, _kill_on_timeout)
+                watchdog.start()
+                try:
+                    # Stream stdout line-by-line: JSON extraction overlaps with
+                    # Java execution instead of waiting for process exit.
+                    objects: List[Dict[str, Any]] = []
+                    output_lines: List[str] = []
+                    for raw_line in run_proc.stdout:
+                        line = raw_line.decode("utf-8", errors="replace")
+                        output_lines.append(line)
+                        objects.extend(self._extract_json_objects(line))
+                    returncode = run_proc.wait()
+                finally:
+                    watchdog.cancel()
+                stderr_thread.join(timeout=5)
+
+                result["run_output"] = "".join(output_lines)
+                stderr_bytes = stderr_chunks[0] if stderr_chunks else b""
+                if timed_out[0] or returncode != 0:
+                    result["run_error"] = stderr_bytes.decode("utf-8", errors="replace")
+
+                if timed_out[0]:
+                    result["error"] = "Execution timed out"
+                    return result
+                if returncode != 0:
+                    # Source mode merges compile and run diagnostics on stderr;
+                    # javac-style "<file>.java:<line>: error:" markers mean the
+                    # failure happened at compile time.
+                    if use_source_mode and _COMPILE_ERROR_MARKER_RE.search(result["run_error"]):
+                        result["compile_output"] = result["run_error"]
+                        result["run_error"] = ""
+                        result["error"] = f"Compilation failed: {result['compile_output']}"
+                    else:
+                        result["error"] = f"Execution failed (exit code {returncode}): {result['run_error']}"
                     return result
-            except subprocess.TimeoutExpired:
-                result["error"] = "Execution timed out"
-                return result
             except Exception as e:
                 result["error"] = f"Execution error: {e}"
                 return result
 
-            # Parse JSON objects from stdout
-            objects = self._extract_json_objects(result["run_output"])
             result["objects"] = objects
             result["success"] = True
+            self._store_cached_result(cache_key, result)
 
         return result
 
@@ -148,33 +542,58 @@ class CodeExecutorAgent:
         """
         Extract JSON objects from stdout.
 
-        Looks for lines containing JSON objects (starting with '{' and ending with '}').
+        Walks the output with a single JSONDecoder, jumping to each '{' and
+        attempting a raw_decode there. This skips log noise without per-line
+        splitting/predicate checks and also handles JSON objects that span
+        multiple lines (which a line-based scan would drop).
+
         Supports two formats:
         1. New format: {"variable": "<var_name>", "object": <json_object>}
         2. Legacy format: <json_object> (for backward compatibility)
         """
         objects = []
-        lines = stdout.strip().split("\n")
 
-        for line in lines:
-            line = line.strip()
-            if not line or not (line.startswith("{") and line.endswith("}")):
-                continue
+        # Fast path: output that is exactly one JSON object (the common case
+        # for the per-line streaming caller) goes straight through orjson /
+        # json.loads without the decoder walk below.
+        stripped = stdout.strip()
+        if stripped.startswith("{") and stripped.endswith("}"):
             try:
-                obj = json.loads(line)
-                # Check if it's the new format with variable mapping
-                if "variable" in obj and "object" in obj:
-                    # New format: extract the variable name and object
-                    objects.append({
-                        "variable": obj["variable"],
-                        "object": obj["object"],
-                    })
-                else:
-                    # Legacy format: just the object itself
-                    objects.append(obj)
+                obj = _fast_loads(stripped)
+            except ValueError:
+                pass
+            else:
+                if isinstance(obj, dict):
+                    if "variable" in obj and "object" in obj:
+                        objects.append({
+                            "variable": obj["variable"],
+                            "object": obj["object"],
+                        })
+                    else:
+                        objects.append(obj)
+                    return objects
+
+        decoder = json.JSONDecoder()
+        idx = stdout.find("{")
+
+        while idx != -1:
+            try:
+                obj, end = decoder.raw_decode(stdout, idx)
             except json.JSONDecodeError:
-                # Skip lines that aren't valid JSON
+                # Not valid JSON here; try the next '{'
+                idx = stdout.find("{", idx + 1)
                 continue
+            # Check if it's the new format with variable mapping
+            if "variable" in obj and "object" in obj:
+                # New format: extract the variable name and object
+                objects.append({
+                    "variable": obj["variable"],
+                    "object": obj["object"],
+                })
+            else:
+                # Legacy format: just the object itself
+                objects.append(obj)
+            idx = stdout.find("{", end)
 
         return objects
 
@@ -194,8 +613,4 @@ class CodeExecutorAgent:
 
     def _detect_public_class_name(self, java_code: str) -> Optional[str]:
         """Detect a public class name to align filename/entrypoint with Java conventions."""
-        # Simple regex to find `public class X` or `public final class X`
-        m = re.search(r"public\s+(?:final\s+)?class\s+(\w+)", java_code)
-        if m:
-            return m.group(1)
-        return None
+        return _detect_public_class_name_cached(java_code)
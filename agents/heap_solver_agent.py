@@ -6,6 +6,7 @@ analyze heap-related constraints for each variable in the constraint set (includ
 generate reference types for each variable.
 """
 
+import json
 from typing import List, Dict, Optional, Any, Tuple
 from pathlib import Path
 from langchain_openai import ChatOpenAI
@@ -13,6 +14,41 @@ from langchain_core.messages import SystemMessage, HumanMessage
 
 from .utils import extract_first_json
 
+# Serialize the type_solver block with orjson when available: its C
+# implementation indents large valuations several times faster than the
+# stdlib. Falls back transparently when orjson is not installed.
+try:
+    import orjson
+
+    def _dumps_indented(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _dumps_indented(obj: Any) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+# ctx.md cache: the reference file does not change during a run, so read and
+# strip it once per process instead of on every solve() call. The mtime stamp
+# lets live edits during development still be picked up.
+_CTX_PATH = Path(__file__).parent.parent / "ctx.md"
+_ctx_cache: Optional[str] = None
+_ctx_cache_mtime: Optional[float] = None
+
+
+def _load_ctx() -> str:
+    """Return the stripped contents of ctx.md, cached until the file changes."""
+    global _ctx_cache, _ctx_cache_mtime
+    try:
+        mtime = _CTX_PATH.stat().st_mtime
+    except OSError:
+        return ""
+    if _ctx_cache is None or mtime != _ctx_cache_mtime:
+        try:
+            _ctx_cache = _CTX_PATH.read_text(encoding="utf-8").strip()
+            _ctx_cache_mtime = mtime
+        except OSError:
+            return ""
+    return _ctx_cache
+
 
 class HeapSolverAgent:
     """
@@ -39,6 +75,64 @@ class HeapSolverAgent:
     }
     """
     
+    # The system prompt never varies between calls; build both the string
+    # and its SystemMessage once so every invocation reuses one object
+    # (this also helps providers that cache identical system prompts).
+    _SYSTEM_PROMPT = (
+        "You are an assistant specialized in solving heap-related constraints. "
+        "Your task is to analyze heap-related constraints for each variable in the constraint set "
+        "(including null constraints, reference relationships) based on type_solver results, "
+        "generate reference types for each variable.\n\n"
+        "Naming note: variables written with the suffix '(ref)' denote symbolic reference variables; "
+        "they correspond to the same variable names in code without '(ref)', but in your final answer you must keep the '(ref)' suffix.\n\n"
+        "CRITICAL: Understanding Type vs Value:\n"
+        "In Java, a variable's TYPE (declared type) and its VALUE (runtime value) are SEPARATE concepts.\n"
+        "- A variable can have type 'Node' but value 'null' - this is VALID and SATISFIABLE\n"
+        "- Example: 'Node n = null;' - type is Node, value is null\n"
+        "- type_solver provides the TYPE information (what type the variable can be)\n"
+        "- heap_solver provides the VALUE information (whether it's null or points to an object)\n"
+        "- A constraint like 'x is null' means the VALUE is null, but the TYPE can still be specified\n"
+        "- type_solver assigning type 'LNode;' to a variable does NOT mean it cannot be null\n"
+        "- A variable with type 'LNode;' can have reference=null if constraints require it\n\n"
+        "Important constraints:\n"
+        "1. Cannot override type_solver TYPE results - types must match\n"
+        "2. Must maintain type information determined by type_solver\n"
+        "3. Add heap-related information (newObject, trueRef, reference) on this basis\n"
+        "4. MUST provide information for ALL variable expressions from type_solver output\n"
+        "5. If constraints say a variable is null, set reference=null even if type_solver gave it a type\n\n"
+        "Output format:\n"
+        "- SAT: return {\"result\": \"SAT\", \"valuation\": [...]}\n"
+        "- UNSAT: return {\"result\": \"UNSAT\"}\n"
+        "- UNKNOWN: return {\"result\": \"UNKNOWN\"}\n\n"
+        "For SAT valuations, each entry should contain:\n"
+        "- variable: variable name (e.g., \"head(ref)\" or \"head(ref).next(ref)\")\n"
+        "- type: JVM format type (must match type_solver results)\n"
+        "- newObject: boolean (default true for new objects, false only if the reference points to another existing object or an object already in the heap)\n"
+        "  Note: When solving high-level constraints, the task is to construct valid inputs for the method. "
+        "Even if a variable is a method input parameter, newObject can still be true when creating new test inputs.\n"
+        "- trueRef: boolean (true for symbolic reference, false for concrete address)\n"
+        "- reference: unique ID (integer for new objects, null ONLY if constraints explicitly require null)\n"
+        "  IMPORTANT: Prefer creating actual objects (use positive integer IDs) over null references.\n"
+        "  Only use null if constraints explicitly state that a variable must be null.\n\n"
+        "Important rules:\n"
+        "1. MUST include ALL variables that type_solver provided in your valuation\n"
+        "2. Do not invent new variable names that weren't in type_solver output\n"
+        "3. Types must exactly match type_solver output\n"
+        "4. If type_solver result is UNSAT, return UNSAT directly\n"
+        "5. When constructing method inputs, newObject=true is valid for input parameters that need new object instances\n"
+        "6. CRITICAL: Type and Value are SEPARATE - a variable can have a type but value=null:\n"
+        "   - type_solver provides TYPE information (declared type)\n"
+        "   - heap_solver provides VALUE information (reference/object ID)\n"
+        "   - Example: type='LNode;', reference=null is VALID (like 'Node n = null;')\n"
+        "   - If constraint says 'x is null', set reference=null regardless of type from type_solver\n"
+        "   - type_solver assigning a type does NOT mean the value cannot be null\n"
+        "   - Only return UNSAT if there's a real type mismatch, NOT if a typed variable is null\n"
+        "7. When constraints explicitly require null, set reference=null even if type_solver gave a type\n"
+        "8. Only create actual objects (reference with positive ID) when constraints require non-null\n\n"
+        "You may show your reasoning process, but the final output must be valid JSON format."
+    )
+    _SYSTEM_MESSAGE = SystemMessage(content=_SYSTEM_PROMPT)
+
     def __init__(self, llm: ChatOpenAI):
         """
         Initialize HeapSolverAgent.
@@ -67,174 +161,293 @@ class HeapSolverAgent:
         Returns:
             Tuple of (parsed_json_dict, raw_llm_output_string, conversation_log)
         """
-        # Read ctx.md for reference information
-        ctx_content = ""
+        system_prompt, human_prompt = self._build_prompts(
+            constraints, source_context, heap_state, type_solver_output
+        )
+
         try:
-            ctx_path = Path(__file__).parent.parent / "ctx.md"
-            if ctx_path.exists():
-                ctx_content = ctx_path.read_text(encoding="utf-8").strip()
-        except Exception:
-            pass
-        
-        system_prompt = (
-            "You are an assistant specialized in solving heap-related constraints. "
-            "Your task is to analyze heap-related constraints for each variable in the constraint set "
-            "(including null constraints, reference relationships) based on type_solver results, "
-            "generate reference types for each variable.\n\n"
-            "Naming note: variables written with the suffix '(ref)' denote symbolic reference variables; "
-            "they correspond to the same variable names in code without '(ref)', but in your final answer you must keep the '(ref)' suffix.\n\n"
-            "CRITICAL: Understanding Type vs Value:\n"
-            "In Java, a variable's TYPE (declared type) and its VALUE (runtime value) are SEPARATE concepts.\n"
-            "- A variable can have type 'Node' but value 'null' - this is VALID and SATISFIABLE\n"
-            "- Example: 'Node n = null;' - type is Node, value is null\n"
-            "- type_solver provides the TYPE information (what type the variable can be)\n"
-            "- heap_solver provides the VALUE information (whether it's null or points to an object)\n"
-            "- A constraint like 'x is null' means the VALUE is null, but the TYPE can still be specified\n"
-            "- type_solver assigning type 'LNode;' to a variable does NOT mean it cannot be null\n"
-            "- A variable with type 'LNode;' can have reference=null if constraints require it\n\n"
-            "Important constraints:\n"
-            "1. Cannot override type_solver TYPE results - types must match\n"
-            "2. Must maintain type information determined by type_solver\n"
-            "3. Add heap-related information (newObject, trueRef, reference) on this basis\n"
-            "4. MUST provide information for ALL variable expressions from type_solver output\n"
-            "5. If constraints say a variable is null, set reference=null even if type_solver gave it a type\n\n"
-            "Output format:\n"
-            "- SAT: return {\"result\": \"SAT\", \"valuation\": [...]}\n"
-            "- UNSAT: return {\"result\": \"UNSAT\"}\n"
-            "- UNKNOWN: return {\"result\": \"UNKNOWN\"}\n\n"
-            "For SAT valuations, each entry should contain:\n"
-            "- variable: variable name (e.g., \"head(ref)\" or \"head(ref).next(ref)\")\n"
-            "- type: JVM format type (must match type_solver results)\n"
-            "- newObject: boolean (default true for new objects, false only if the reference points to another existing object or an object already in the heap)\n"
-            "  Note: When solving high-level constraints, the task is to construct valid inputs for the method. "
-            "Even if a variable is a method input parameter, newObject can still be true when creating new test inputs.\n"
-            "- trueRef: boolean (true for symbolic reference, false for concrete address)\n"
-            "- reference: unique ID (integer for new objects, null ONLY if constraints explicitly require null)\n"
-            "  IMPORTANT: Prefer creating actual objects (use positive integer IDs) over null references.\n"
-            "  Only use null if constraints explicitly state that a variable must be null.\n\n"
-            "Important rules:\n"
-            "1. MUST include ALL variables that type_solver provided in your valuation\n"
-            "2. Do not invent new variable names that weren't in type_solver output\n"
-            "3. Types must exactly match type_solver output\n"
-            "4. If type_solver result is UNSAT, return UNSAT directly\n"
-            "5. When constructing method inputs, newObject=true is valid for input parameters that need new object instances\n"
-            "6. CRITICAL: Type and Value are SEPARATE - a variable can have a type but value=null:\n"
-            "   - type_solver provides TYPE information (declared type)\n"
-            "   - heap_solver provides VALUE information (reference/object ID)\n"
-            "   - Example: type='LNode;', reference=null is VALID (like 'Node n = null;')\n"
-            "   - If constraint says 'x is null', set reference=null regardless of type from type_solver\n"
-            "   - type_solver assigning a type does NOT mean the value cannot be null\n"
-            "   - Only return UNSAT if there's a real type mismatch, NOT if a typed variable is null\n"
-            "7. When constraints explicitly require null, set reference=null even if type_solver gave a type\n"
-            "8. Only create actual objects (reference with positive ID) when constraints require non-null\n\n"
-            "You may show your reasoning process, but the final output must be valid JSON format."
+            raw_output = self._invoke_streaming([
+                self._SYSTEM_MESSAGE,
+                HumanMessage(content=human_prompt),
+            ])
+            return self._package_result(raw_output, system_prompt, human_prompt)
+        except Exception as e:
+            return self._package_error(e, system_prompt, human_prompt)
+
+    def _invoke_streaming(self, messages: List[Any]) -> str:
+        """
+        Stream the LLM response, stopping as soon as a complete JSON object
+        has been received.
+
+        Many responses emit the answer JSON followed by a trailing prose
+        recap; cutting the stream once the first balanced {...} parses saves
+        that tail's latency. The returned string is whatever was received, so
+        logs still show the (possibly truncated) raw output.
+        """
+        if not hasattr(self.llm, "stream"):
+            response = self.llm.invoke(messages)
+            return response.content if hasattr(response, 'content') else str(response)
+
+        chunks: List[str] = []
+        depth = 0
+        started = False
+        in_string = False
+        escaped = False
+        for chunk in self.llm.stream(messages):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if not text:
+                continue
+            chunks.append(text)
+            # Track brace balance across chunk boundaries, ignoring braces
+            # inside JSON strings.
+            closed = False
+            for ch in text:
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == '\\':
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '{':
+                    started = True
+                    depth += 1
+                elif ch == '}' and started:
+                    depth -= 1
+                    if depth == 0:
+                        closed = True
+                        break
+                elif ch == '"' and started and depth > 0:
+                    in_string = True
+            if closed:
+                # Balanced braces may also come from code in prose; only stop
+                # if the accumulated text really contains parseable JSON.
+                parsed, _ = extract_first_json("".join(chunks))
+                if parsed is not None:
+                    break
+                started = False
+        return "".join(chunks)
+
+    async def asolve(
+        self,
+        constraints: List[str],
+        source_context: Optional[Dict[str, Any]] = None,
+        heap_state: Optional[Dict[str, Any]] = None,
+        type_solver_output: Optional[Dict] = None,
+    ) -> Tuple[Optional[Dict], str, Dict[str, Any]]:
+        """
+        Async variant of solve(): identical prompts, awaits llm.ainvoke so
+        many constraint sets can be solved concurrently (the calls are
+        network-bound, so wall-clock for N tasks approaches one latency).
+        """
+        system_prompt, human_prompt = self._build_prompts(
+            constraints, source_context, heap_state, type_solver_output
         )
-        
+
+        try:
+            response = await self.llm.ainvoke([
+                self._SYSTEM_MESSAGE,
+                HumanMessage(content=human_prompt),
+            ])
+            raw_output = response.content if hasattr(response, 'content') else str(response)
+            return self._package_result(raw_output, system_prompt, human_prompt)
+        except Exception as e:
+            return self._package_error(e, system_prompt, human_prompt)
+
+    def solve_batch(
+        self,
+        inputs: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+    ) -> List[Tuple[Optional[Dict], str, Dict[str, Any]]]:
+        """
+        Solve several constraint sets in one llm.batch() round trip.
+
+        Args:
+            inputs: List of dicts with the same keys solve() accepts
+                (constraints, source_context, heap_state, type_solver_output)
+            max_concurrency: Concurrency limit forwarded to the LLM client
+
+        Returns:
+            One (parsed, raw_output, log_entry) tuple per input, in order
+        """
+        prompts = [
+            self._build_prompts(
+                item.get("constraints", []),
+                item.get("source_context"),
+                item.get("heap_state"),
+                item.get("type_solver_output"),
+            )
+            for item in inputs
+        ]
+        message_lists = [
+            [self._SYSTEM_MESSAGE, HumanMessage(content=human)]
+            for _system, human in prompts
+        ]
+
+        try:
+            responses = self.llm.batch(
+                message_lists, config={"max_concurrency": max_concurrency}
+            )
+        except Exception as e:
+            return [
+                self._package_error(e, system, human) for system, human in prompts
+            ]
+
+        results = []
+        for (system, human), response in zip(prompts, responses):
+            raw_output = response.content if hasattr(response, 'content') else str(response)
+            results.append(self._package_result(raw_output, system, human))
+        return results
+
+    def _package_result(
+        self, raw_output: str, system_prompt: str, human_prompt: str
+    ) -> Tuple[Optional[Dict], str, Dict[str, Any]]:
+        """Parse a raw LLM response and build the conversation log entry."""
+        parsed, _ = extract_first_json(raw_output)
+        log_entry = {
+            "agent": "heap_solver",
+            "stage": "solve",
+            "system": system_prompt,
+            "human": human_prompt,
+            "response": raw_output,
+        }
+        return parsed, raw_output, log_entry
+
+    def _package_error(
+        self, error: Exception, system_prompt: str, human_prompt: str
+    ) -> Tuple[None, str, Dict[str, Any]]:
+        """Build the failure tuple and log entry for an LLM invocation error."""
+        log_entry = {
+            "agent": "heap_solver",
+            "stage": "solve",
+            "system": system_prompt,
+            "human": human_prompt,
+            "response": "",
+            "error": str(error),
+        }
+        return None, f"Error during HeapSolver invocation: {str(error)}", log_entry
+
+    def _build_prompts(
+        self,
+        constraints: List[str],
+        source_context: Optional[Dict[str, Any]],
+        heap_state: Optional[Dict[str, Any]],
+        type_solver_output: Optional[Dict],
+    ) -> Tuple[str, str]:
+        """Assemble the (system, human) prompt pair for a solve request."""
+        # Reference information from ctx.md (cached at module level)
+        ctx_content = _load_ctx()
+
         constraints_block = "\n".join(f"- {c}" for c in constraints)
-        
-        # Build type_solver output information block
-        type_solver_block = ""
+
+        # Build type_solver output information block.
+        # All blocks below are assembled as part lists joined once at the end:
+        # repeated `+=` on str re-materializes the growing prefix each time,
+        # which gets quadratic for large class sources and heap dumps.
         if type_solver_output:
-            type_solver_block = "Type Solver Results (must be respected):\n"
-            type_solver_block += "```json\n"
-            import json
-            type_solver_block += json.dumps(type_solver_output, indent=2, ensure_ascii=False)
-            type_solver_block += "\n```\n\n"
-            type_solver_block += "Important: You cannot change TYPE information determined by type_solver. "
-            type_solver_block += "However, remember that TYPE and VALUE are separate: a variable can have type from type_solver but value=null if constraints require it. "
-            type_solver_block += "If conflicts are found, return UNSAT.\n\n"
+            type_solver_block = "".join((
+                "Type Solver Results (must be respected):\n",
+                "```json\n",
+                _dumps_indented(type_solver_output),
+                "\n```\n\n",
+                "Important: You cannot change TYPE information determined by type_solver. ",
+                "However, remember that TYPE and VALUE are separate: a variable can have type from type_solver but value=null if constraints require it. ",
+                "If conflicts are found, return UNSAT.\n\n",
+            ))
         else:
             type_solver_block = "Warning: No type_solver output available.\n\n"
-        
+
         # Build source code context block (defensive against unexpected shapes)
         source_context_block = ""
         if isinstance(source_context, dict) and source_context:
-            source_context_block = "Source Code Context:\n"
-            source_context_block += "This is the actual source code of the method being analyzed. "
-            source_context_block += "Use it to understand code structure, logic, and relationships.\n\n"
-            
+            parts = [
+                "Source Code Context:\n",
+                "This is the actual source code of the method being analyzed. ",
+                "Use it to understand code structure, logic, and relationships.\n\n",
+            ]
+
             method_name = source_context.get("method_name")
             if isinstance(method_name, str) and method_name:
-                source_context_block += f"Method: {method_name}\n"
+                parts.append(f"Method: {method_name}\n")
             class_name = source_context.get("class_name")
             if isinstance(class_name, str) and class_name:
-                source_context_block += f"Class: {class_name}\n"
+                parts.append(f"Class: {class_name}\n")
             source_file = source_context.get("source_file")
             if isinstance(source_file, str) and source_file:
-                source_context_block += f"File: {source_file}\n"
-            
+                parts.append(f"File: {source_file}\n")
+
             line_info = source_context.get("line_numbers")
             if isinstance(line_info, dict):
-                source_context_block += f"Lines: {line_info.get('method_start', '?')}-{line_info.get('method_end', '?')}\n"
-            
-            source_context_block += "\n"
-            
+                parts.append(f"Lines: {line_info.get('method_start', '?')}-{line_info.get('method_end', '?')}\n")
+
+            parts.append("\n")
+
             method_source = source_context.get("method_source")
             if isinstance(method_source, str) and method_source:
-                source_context_block += "Method Source Code:\n"
-                source_context_block += "```java\n"
-                source_context_block += method_source
-                source_context_block += "```\n\n"
-            
+                parts.extend(("Method Source Code:\n", "```java\n", method_source, "```\n\n"))
+
             class_source = source_context.get("class_source")
             if isinstance(class_source, str) and class_source:
-                source_context_block += "Complete Class Source Code:\n"
-                source_context_block += "```java\n"
-                source_context_block += class_source
-                source_context_block += "```\n\n"
-            
+                parts.extend(("Complete Class Source Code:\n", "```java\n", class_source, "```\n\n"))
+
             related = source_context.get("related_classes")
             if isinstance(related, dict) and related:
-                source_context_block += "Related Classes (referenced in constraints):\n"
+                parts.append("Related Classes (referenced in constraints):\n")
                 for class_name, class_src in related.items():
                     if isinstance(class_src, str) and class_src:
-                        source_context_block += f"\nClass: {class_name}\n"
-                        source_context_block += "```java\n"
-                        source_context_block += class_src
-                        source_context_block += "```\n"
-                source_context_block += "\n"
-        
+                        parts.extend((f"\nClass: {class_name}\n", "```java\n", class_src, "```\n"))
+                parts.append("\n")
+
+            source_context_block = "".join(parts)
+
         # Build heap state information block (defensive against unexpected shapes)
         heap_state_block = ""
         if isinstance(heap_state, dict) and heap_state:
-            heap_state_block = "Heap State Information:\n"
-            heap_state_block += "This shows the current state of reachable objects in the heap.\n\n"
-            
+            parts = [
+                "Heap State Information:\n",
+                "This shows the current state of reachable objects in the heap.\n\n",
+            ]
+
             aliases = heap_state.get("aliases")
             if isinstance(aliases, dict) and aliases:
-                heap_state_block += "Aliases (variable → object reference):\n"
+                parts.append("Aliases (variable → object reference):\n")
                 for var_name, obj_ref in aliases.items():
-                    heap_state_block += f"  {var_name} → {obj_ref}\n"
-                heap_state_block += "\n"
-            
+                    parts.append(f"  {var_name} → {obj_ref}\n")
+                parts.append("\n")
+
             objects = heap_state.get("objects")
             if isinstance(objects, dict) and objects:
-                heap_state_block += "Objects (reference → structure):\n"
+                parts.append("Objects (reference → structure):\n")
                 for obj_ref, obj_desc in objects.items():
                     if not isinstance(obj_desc, dict):
-                        heap_state_block += f"  {obj_ref}: Unknown (non-dict)\n\n"
+                        parts.append(f"  {obj_ref}: Unknown (non-dict)\n\n")
                         continue
                     class_name = obj_desc.get("class", "Unknown")
-                    heap_state_block += f"  {obj_ref}: {class_name}\n"
-                    
+                    parts.append(f"  {obj_ref}: {class_name}\n")
+
                     fields = obj_desc.get("fields", {})
                     if isinstance(fields, dict) and fields:
                         for field_name, field_value in fields.items():
-                            heap_state_block += f"    {field_name}: {field_value}\n"
-                    
+                            parts.append(f"    {field_name}: {field_value}\n")
+
                     if "elements" in obj_desc:
-                        heap_state_block += f"    elements: {obj_desc['elements']}\n"
+                        parts.append(f"    elements: {obj_desc['elements']}\n")
                     if "length" in obj_desc:
-                        heap_state_block += f"    length: {obj_desc['length']}\n"
-                    
-                    heap_state_block += "\n"
-        
+                        parts.append(f"    length: {obj_desc['length']}\n")
+
+                    parts.append("\n")
+
+            heap_state_block = "".join(parts)
+
         # Build reference information block from ctx.md
         reference_block = ""
         if ctx_content:
-            reference_block = "Reference Information:\n"
-            reference_block += "The following reference information may help you understand the constraints and solve them correctly:\n\n"
-            reference_block += ctx_content + "\n\n"
+            reference_block = "".join((
+                "Reference Information:\n",
+                "The following reference information may help you understand the constraints and solve them correctly:\n\n",
+                ctx_content,
+                "\n\n",
+            ))
         
         human_prompt = (
             f"{reference_block}"
@@ -244,30 +457,5 @@ class HeapSolverAgent:
             f"Constraints:\n{constraints_block}\n\n"
             "Please analyze heap-related constraints based on type_solver results and provide your answer (JSON format)."
         )
-        
-        try:
-            response = self.llm.invoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=human_prompt),
-            ])
-            raw_output = response.content if hasattr(response, 'content') else str(response)
-            
-            parsed, _ = extract_first_json(raw_output)
-            log_entry = {
-                "agent": "heap_solver",
-                "stage": "solve",
-                "system": system_prompt,
-                "human": human_prompt,
-                "response": raw_output,
-            }
-            return parsed, raw_output, log_entry
-        except Exception as e:
-            log_entry = {
-                "agent": "heap_solver",
-                "stage": "solve",
-                "system": system_prompt,
-                "human": human_prompt,
-                "response": "",
-                "error": str(e),
-            }
-            return None, f"Error during HeapSolver invocation: {str(e)}", log_entry
+
+        return self._SYSTEM_PROMPT, human_prompt
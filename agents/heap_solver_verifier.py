@@ -7,7 +7,86 @@ Responsibilities:
 3. Validate compliance with type_solver results
 """
 
-from typing import List, Dict, Optional, Any
+import copy
+import hashlib
+import json
+import sys
+from dataclasses import dataclass, asdict
+from typing import Final, Iterator, List, Dict, Optional, Any
+
+# Error-type tags, interned once: comparisons become identity checks and a
+# typo in a new call site fails loudly instead of minting a new category.
+ERR_INVALID_JSON: Final = sys.intern("INVALID_JSON")
+ERR_INVALID_TYPE: Final = sys.intern("INVALID_TYPE")
+ERR_INVALID_VALUE: Final = sys.intern("INVALID_VALUE")
+ERR_INVALID_VARIABLE: Final = sys.intern("INVALID_VARIABLE")
+ERR_MISSING_FIELD: Final = sys.intern("MISSING_FIELD")
+ERR_TYPE_MISMATCH: Final = sys.intern("TYPE_MISMATCH")
+
+
+@dataclass(slots=True)
+class VerificationError:
+    """One verifier finding; converted to a plain dict at the API boundary."""
+    error_type: str
+    location: str
+    message: str
+
+# Upper bound on memoized verification results per verifier instance
+_VERIFY_CACHE_MAX_ENTRIES = 512
+
+# Fields every non-null reference valuation entry must carry. Built once;
+# differencing against entry.keys() (already a set view) allocates nothing
+# extra per entry.
+_REQUIRED_REF_FIELDS = frozenset({"type", "newObject", "trueRef", "reference"})
+
+_REF_SUFFIX = "(ref)"
+_REF_SUFFIX_LEN = len(_REF_SUFFIX)
+
+
+def _is_ident_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _scan_ref_vars(text: str) -> Iterator[str]:
+    """
+    Yield variable references `varname(ref)` / `varname(ref).field(ref)...`
+    (optionally with a plain leading segment, e.g. `this.head(ref)`).
+
+    Linear scan anchored on the literal `(ref)` marker via str.find, so there
+    is no regex backtracking and cost stays O(n) even on pathological
+    constraint strings.
+    """
+    i = 0
+    n = len(text)
+    while (j := text.find(_REF_SUFFIX, i)) != -1:
+        end = j + _REF_SUFFIX_LEN
+        # Walk back over the identifier that owns this `(ref)`
+        k = j
+        while k and _is_ident_char(text[k - 1]):
+            k -= 1
+        if k == j or text[k].isdigit():
+            i = end
+            continue
+        start = k
+        # Optional single plain leading segment: `obj.field(ref)`
+        if start >= 2 and text[start - 1] == '.':
+            m = start - 1
+            while m and _is_ident_char(text[m - 1]):
+                m -= 1
+            if m < start - 1 and not text[m].isdigit():
+                start = m
+        # Extend forward over `.field(ref)` continuations of the chain
+        while text.startswith('.', end):
+            p = end + 1
+            q = p
+            while q < n and _is_ident_char(text[q]):
+                q += 1
+            if q > p and text.startswith(_REF_SUFFIX, q):
+                end = q + _REF_SUFFIX_LEN
+            else:
+                break
+        yield text[start:end]
+        i = end
 
 
 class HeapSolverVerifier:
@@ -32,85 +111,137 @@ class HeapSolverVerifier:
     }
     """
     
+    def __init__(self):
+        # Retry loops often re-verify identical (constraints, outputs)
+        # triples; memoize by content hash so repeats skip all checking.
+        self._cache: Dict[bytes, Dict[str, Any]] = {}
+        # One-slot fast path for the immediate-repeat case (temperature-0
+        # retries that return the same output back to back).
+        self._last_key: Optional[bytes] = None
+        self._last_result: Optional[Dict[str, Any]] = None
+
     def verify(
         self,
         constraints: List[str],
         heap_solver_output: Optional[Dict],
         type_solver_output: Optional[Dict] = None,
+        *,
+        variables: Optional[set] = None,
     ) -> Dict[str, Any]:
         """
         Verify heap_solver output.
-        
+
+        Results are memoized by a content hash of the inputs; repeated
+        verification of unchanged outputs (common in the agent → verifier →
+        regenerate loop) is a dict hit.
+
         Args:
             constraints: List of constraints
             heap_solver_output: heap_solver output
             type_solver_output: type_solver output (for consistency validation)
-        
+            variables: Optional pre-extracted constraint variable set; callers
+                verifying the same constraints repeatedly can compute it once
+                with _extract_variables_from_constraints and share it here.
+
         Returns:
             Verification result dictionary containing is_well_formed and errors
         """
+        key = self._cache_key(constraints, heap_solver_output, type_solver_output)
+        if key is not None:
+            if key == self._last_key:
+                return copy.deepcopy(self._last_result)
+            cached = self._cache.get(key)
+            if cached is not None:
+                # Copy so callers mutating the result cannot poison the cache
+                self._last_key = key
+                self._last_result = cached
+                return copy.deepcopy(cached)
+
+        result = self._verify_uncached(
+            constraints, heap_solver_output, type_solver_output, variables=variables
+        )
+
+        if key is not None:
+            if len(self._cache) >= _VERIFY_CACHE_MAX_ENTRIES:
+                # Drop the oldest entry (insertion-ordered dict)
+                self._cache.pop(next(iter(self._cache)))
+            stored = copy.deepcopy(result)
+            self._cache[key] = stored
+            self._last_key = key
+            self._last_result = stored
+        return result
+
+    @staticmethod
+    def _cache_key(
+        constraints: List[str],
+        heap_solver_output: Optional[Dict],
+        type_solver_output: Optional[Dict],
+    ) -> Optional[bytes]:
+        """Stable content hash of the verification inputs (None if unhashable)."""
+        try:
+            payload = json.dumps(
+                [constraints, heap_solver_output, type_solver_output],
+                sort_keys=True,
+                default=str,
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+    def _verify_uncached(
+        self,
+        constraints: List[str],
+        heap_solver_output: Optional[Dict],
+        type_solver_output: Optional[Dict] = None,
+        *,
+        variables: Optional[set] = None,
+    ) -> Dict[str, Any]:
+        """Run the actual verification checks (see verify)."""
         errors = []
         
         # Check JSON format
         if heap_solver_output is None:
-            errors.append({
-                "error_type": "INVALID_JSON",
-                "location": "root",
-                "message": "Cannot parse JSON format"
-            })
+            errors.append(VerificationError(ERR_INVALID_JSON, "root", "Cannot parse JSON format"))
             return {
                 "is_well_formed": False,
-                "errors": errors
+                "errors": [asdict(e) for e in errors]
             }
 
         # Defensive: the JSON extractor may return a list if it accidentally parsed something.
         # Verifiers must never crash; treat it as malformed output.
         if not isinstance(heap_solver_output, dict):
-            errors.append({
-                "error_type": "INVALID_TYPE",
-                "location": "root",
-                "message": f"Expected object at root, got {type(heap_solver_output)}"
-            })
+            errors.append(VerificationError(ERR_INVALID_TYPE, "root", f"Expected object at root, got {type(heap_solver_output)}"))
             return {
                 "is_well_formed": False,
-                "errors": errors
+                "errors": [asdict(e) for e in errors]
             }
         
         # Check result field
         if "result" not in heap_solver_output:
-            errors.append({
-                "error_type": "MISSING_FIELD",
-                "location": "result",
-                "message": "Missing 'result' field"
-            })
+            errors.append(VerificationError(ERR_MISSING_FIELD, "result", "Missing 'result' field"))
         else:
             result = heap_solver_output.get("result")
             if result not in ["SAT", "UNSAT", "UNKNOWN"]:
-                errors.append({
-                    "error_type": "INVALID_VALUE",
-                    "location": "result",
-                    "message": f"Invalid result value: {result}"
-                })
+                errors.append(VerificationError(ERR_INVALID_VALUE, "result", f"Invalid result value: {result}"))
         
         # If SAT, check valuation
         if heap_solver_output.get("result") == "SAT":
             if "valuation" not in heap_solver_output:
-                errors.append({
-                    "error_type": "MISSING_FIELD",
-                    "location": "valuation",
-                    "message": "SAT result missing 'valuation' field"
-                })
+                errors.append(VerificationError(ERR_MISSING_FIELD, "valuation", "SAT result missing 'valuation' field"))
             else:
                 valuation = heap_solver_output.get("valuation")
                 if not isinstance(valuation, list):
-                    errors.append({
-                        "error_type": "INVALID_TYPE",
-                        "location": "valuation",
-                        "message": f"'valuation' should be an array, got {type(valuation)}"
-                    })
-                else:
-                    # Extract variables from constraints
-                    base_variables = self._extract_variables_from_constraints(constraints)
+                    errors.append(VerificationError(ERR_INVALID_TYPE, "valuation", f"'valuation' should be an array, got {type(valuation)}"))
+                elif valuation:
+                    # Only reached for a SAT result with a non-empty valuation
+                    # list; UNSAT/UNKNOWN and degenerate shapes never pay for
+                    # variable extraction or the type-map construction.
+                    # Extract variables from constraints (unless pre-shared)
+                    base_variables = (
+                        variables
+                        if variables is not None
+                        else self._extract_variables_from_constraints(constraints)
+                    )
                     
                     # Build type_solver variable type mapping
                     type_solver_type_map = {}
@@ -119,60 +250,88 @@ class HeapSolverVerifier:
                         for entry in type_valuation:
                             if isinstance(entry, dict) and "variable" in entry and "type" in entry:
                                 type_solver_type_map[entry["variable"]] = entry["type"]
-                    
-                    # Check each valuation entry
-                    for idx, entry in enumerate(valuation):
-                        if not isinstance(entry, dict):
-                            errors.append({
-                                "error_type": "INVALID_TYPE",
-                                "location": f"valuation[{idx}]",
-                                "message": f"Valuation entry {idx} is not a dict"
-                            })
-                            continue
-                        
-                        # Check variable field
-                        if "variable" not in entry:
-                            errors.append({
-                                "error_type": "MISSING_FIELD",
-                                "location": f"valuation[{idx}].variable",
-                                "message": f"Valuation entry {idx} missing 'variable' field"
-                            })
+
+                    # Bound once so the inner loop pays a single dict.get per
+                    # entry instead of a truthiness check plus two lookups.
+                    _expected_type = type_solver_type_map.get
+
+                    # Check the valuation entries. Fast path when every entry
+                    # is a dict (the overwhelmingly common case): hoist fields
+                    # into parallel lists (AoS -> SoA) and run each check as a
+                    # comprehension, so clean valuations do no per-entry
+                    # error-dict or f-string work at all.
+                    if all(isinstance(entry, dict) for entry in valuation):
+                        var_names = [entry.get("variable") for entry in valuation]
+
+                        missing_var = {
+                            idx for idx, entry in enumerate(valuation)
+                            if "variable" not in entry
+                        }
+                        bad_vars = [
+                            (idx, var_names[idx])
+                            for idx in range(len(valuation))
+                            if idx not in missing_var and var_names[idx] not in base_variables
+                        ]
+                        # Specialized once up front: without type_solver
+                        # output the whole mismatch sweep is dead code, so
+                        # skip it instead of paying a per-entry no-op lookup.
+                        if type_solver_type_map:
+                            type_mismatches = [
+                                (idx, expected, valuation[idx].get("type"))
+                                for idx, var_name in enumerate(var_names)
+                                if idx not in missing_var
+                                and (expected := _expected_type(var_name)) is not None
+                                and valuation[idx].get("type") != expected
+                            ]
                         else:
-                            var_name = entry.get("variable")
-                            # Check if variable name comes from constraints
-                            if var_name not in base_variables:
-                                errors.append({
-                                    "error_type": "INVALID_VARIABLE",
-                                    "location": f"valuation[{idx}].variable",
-                                    "message": f"Variable '{var_name}' not in constraints"
-                                })
-                            
-                            # Check if type matches type_solver
-                            if type_solver_type_map and var_name in type_solver_type_map:
-                                expected_type = type_solver_type_map[var_name]
-                                actual_type = entry.get("type")
-                                if actual_type != expected_type:
-                                    errors.append({
-                                        "error_type": "TYPE_MISMATCH",
-                                        "location": f"valuation[{idx}].type",
-                                        "message": f"Type mismatch: expected {expected_type} (from type_solver), got {actual_type}"
-                                    })
-                        
-                        # For reference variables, check required fields
-                        if "type" in entry and entry["type"] != "null":
-                            required_ref_fields = {"type", "newObject", "trueRef", "reference"}
-                            entry_keys = set(entry.keys())
-                            missing_fields = required_ref_fields - entry_keys
-                            if missing_fields:
-                                errors.append({
-                                    "error_type": "MISSING_FIELD",
-                                    "location": f"valuation[{idx}]",
-                                    "message": f"Valuation entry {idx} missing fields: {missing_fields}"
-                                })
+                            type_mismatches = []
+                        missing_fields_per_entry = [
+                            (idx, missing)
+                            for idx, entry in enumerate(valuation)
+                            if "type" in entry and entry["type"] != "null"
+                            and (missing := _REQUIRED_REF_FIELDS - entry.keys())
+                        ]
+
+                        for idx in sorted(missing_var):
+                            errors.append(VerificationError(ERR_MISSING_FIELD, f"valuation[{idx}].variable", f"Valuation entry {idx} missing 'variable' field"))
+                        for idx, var_name in bad_vars:
+                            errors.append(VerificationError(ERR_INVALID_VARIABLE, f"valuation[{idx}].variable", f"Variable '{var_name}' not in constraints"))
+                        for idx, expected_type, actual_type in type_mismatches:
+                            errors.append(VerificationError(ERR_TYPE_MISMATCH, f"valuation[{idx}].type", f"Type mismatch: expected {expected_type} (from type_solver), got {actual_type}"))
+                        for idx, missing_fields in missing_fields_per_entry:
+                            errors.append(VerificationError(ERR_MISSING_FIELD, f"valuation[{idx}]", f"Valuation entry {idx} missing fields: {set(missing_fields)}"))
+                    else:
+                        # Fallback: malformed entries, checked one at a time
+                        for idx, entry in enumerate(valuation):
+                            if not isinstance(entry, dict):
+                                errors.append(VerificationError(ERR_INVALID_TYPE, f"valuation[{idx}]", f"Valuation entry {idx} is not a dict"))
+                                continue
+
+                            # Check variable field
+                            if "variable" not in entry:
+                                errors.append(VerificationError(ERR_MISSING_FIELD, f"valuation[{idx}].variable", f"Valuation entry {idx} missing 'variable' field"))
+                            else:
+                                var_name = entry.get("variable")
+                                # Check if variable name comes from constraints
+                                if var_name not in base_variables:
+                                    errors.append(VerificationError(ERR_INVALID_VARIABLE, f"valuation[{idx}].variable", f"Variable '{var_name}' not in constraints"))
+
+                                # Check if type matches type_solver
+                                expected_type = _expected_type(var_name)
+                                if expected_type is not None:
+                                    actual_type = entry.get("type")
+                                    if actual_type != expected_type:
+                                        errors.append(VerificationError(ERR_TYPE_MISMATCH, f"valuation[{idx}].type", f"Type mismatch: expected {expected_type} (from type_solver), got {actual_type}"))
+
+                            # For reference variables, check required fields
+                            if "type" in entry and entry["type"] != "null":
+                                missing_fields = _REQUIRED_REF_FIELDS - entry.keys()
+                                if missing_fields:
+                                    errors.append(VerificationError(ERR_MISSING_FIELD, f"valuation[{idx}]", f"Valuation entry {idx} missing fields: {set(missing_fields)}"))
         
         return {
             "is_well_formed": len(errors) == 0,
-            "errors": errors
+            "errors": [asdict(e) for e in errors]
         }
     
     def _extract_variables_from_constraints(self, constraints: List[str]) -> set:
@@ -185,28 +344,11 @@ class HeapSolverVerifier:
         Returns:
             Set of variable names
         """
-        import re
-        variables = set()
-        
-        # Match variable references: varname(ref) or varname(ref).field(ref)...
-        # Handle both quoted and unquoted variable names
-        # Pattern 1: Match quoted variables: 'varname(ref)' or 'varname(ref).field(ref)'
-        pattern_quoted = r"'([a-zA-Z_][a-zA-Z0-9_]*(?:\(ref\))?(?:\.[a-zA-Z_][a-zA-Z0-9_]*\(ref\))*)'"
-        
-        # Pattern 2: Match unquoted variables (backward compatibility)
-        pattern_unquoted = r"\b([a-zA-Z_][a-zA-Z0-9_]*(?:\(ref\))?(?:\.[a-zA-Z_][a-zA-Z0-9_]*\(ref\))*)"
-        
-        for constraint in constraints:
-            # First, try to match quoted variables
-            matches_quoted = re.findall(pattern_quoted, constraint)
-            for match in matches_quoted:
-                if '(ref)' in match:
-                    variables.add(match)
-            
-            # Then, try to match unquoted variables (avoid duplicates)
-            matches_unquoted = re.findall(pattern_unquoted, constraint)
-            for match in matches_unquoted:
-                if '(ref)' in match and match not in variables:
-                    variables.add(match)
-        
-        return variables
+        # One linear scan per constraint; quotes around variable names are
+        # not identifier characters, so quoted and bare spellings fall out
+        # of the same scanner.
+        return {
+            var
+            for constraint in constraints
+            for var in _scan_ref_vars(constraint)
+        }
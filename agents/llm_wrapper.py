@@ -4,16 +4,52 @@ Wrapper for LLM calls with rate limiting support.
 Provides a synchronous wrapper for rate-limited LLM API calls.
 """
 
-import asyncio
+import hashlib
 import logging
-from typing import Any, Callable, Optional
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Callable, Iterator, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import BaseMessage
 
+from config import LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_RESPONSE_CACHE_ENABLED
+
 from .api_rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Entries kept by the in-process response cache before the least recently
+# used one is evicted.
+_RESPONSE_CACHE_MAX = 512
+
+# Whether configure_llm_cache has already run; the LangChain cache is a
+# process-wide global, so it must only be installed once.
+_llm_cache_configured = False
+
+
+def configure_llm_cache() -> None:
+    """
+    Install LangChain's global SQLite LLM cache (once per process).
+
+    A cache hit returns a stored completion without an API call, so
+    identical prompts across test iterations cost neither latency nor
+    tokens. No-op when disabled via LLM_CACHE_ENABLED or when the
+    langchain_community cache backend is not installed.
+    """
+    global _llm_cache_configured
+    if _llm_cache_configured or not LLM_CACHE_ENABLED:
+        return
+    try:
+        from langchain_core.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+    except ImportError:
+        logger.info("[LLM-CACHE] langchain_community not installed, LLM cache disabled")
+        _llm_cache_configured = True
+        return
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+    logger.info(f"[LLM-CACHE] SQLite LLM cache enabled at {LLM_CACHE_PATH}")
+    _llm_cache_configured = True
+
 
 class RateLimitedLLM:
     """
@@ -32,70 +68,126 @@ class RateLimitedLLM:
         """
         self.llm = llm
         self.rate_limiter = get_rate_limiter()
-    
+        # Optional memo of responses keyed on the exact request; a hit
+        # skips both the rate-limiter wait and the network round-trip.
+        self._response_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+
+    def _response_cache_key(self, messages: list[BaseMessage], kwargs: dict) -> Optional[bytes]:
+        """
+        Hash of everything that determines the response: message roles and
+        contents, model name and sampling parameters. None when caching is
+        disabled or the request is not hashable (e.g. non-string content).
+        """
+        if not LLM_RESPONSE_CACHE_ENABLED:
+            return None
+        try:
+            payload = repr([
+                (getattr(m, "type", m.__class__.__name__), m.content)
+                for m in messages
+            ]) + repr((
+                getattr(self.llm, "model_name", None),
+                getattr(self.llm, "temperature", None),
+                getattr(self.llm, "max_tokens", None),
+                sorted(kwargs.items()),
+            ))
+        except Exception:
+            return None
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
     def invoke(self, messages: list[BaseMessage], **kwargs) -> Any:
         """
         Invoke LLM with rate limiting.
-        
+
         Args:
             messages: List of messages to send
             **kwargs: Additional arguments for LLM
-            
+
         Returns:
             LLM response
         """
-        if self.rate_limiter:
-            # Use rate limiter's call_with_retry
-            # Since agents are synchronous, we need to run async code
-            try:
-                # Try to get existing event loop
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # If loop is running, we can't use it - use thread pool
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(
-                            asyncio.run,
-                            self._invoke_with_rate_limit(messages, **kwargs)
-                        )
-                        return future.result()
-                return loop.run_until_complete(
-                    self._invoke_with_rate_limit(messages, **kwargs)
-                )
-            except RuntimeError:
-                # No event loop, create a new one
-                return asyncio.run(
-                    self._invoke_with_rate_limit(messages, **kwargs)
-                )
-        else:
+        cache_key = self._response_cache_key(messages, kwargs)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                return cached
+
+        response = self._invoke_rate_limited(messages, **kwargs)
+
+        if cache_key is not None:
+            self._response_cache[cache_key] = response
+            if len(self._response_cache) > _RESPONSE_CACHE_MAX:
+                self._response_cache.popitem(last=False)
+        return response
+
+    def _invoke_rate_limited(self, messages: list[BaseMessage], **kwargs) -> Any:
+        """Run the actual rate-limited call (the pre-cache invoke body)."""
+        if not self.rate_limiter:
             # No rate limiter, call directly
             return self.llm.invoke(messages, **kwargs)
-    
-    async def _invoke_with_rate_limit(
-        self,
-        messages: list[BaseMessage],
-        **kwargs
-    ) -> Any:
+        # invoke() is synchronous, so use the limiter's sync path: same
+        # token buckets and retry/backoff, blocking this thread with
+        # time.sleep instead of building an event loop (or executor
+        # hand-off) per call.
+        def _call_llm():
+            return self.llm.invoke(messages, **kwargs)
+
+        return self.rate_limiter.call_with_retry_sync(_call_llm)
+
+    def stream(self, messages: list[BaseMessage], **kwargs) -> Iterator[Any]:
         """
-        Async wrapper for rate-limited invoke.
-        
-        Args:
-            messages: List of messages to send
-            **kwargs: Additional arguments for LLM
-            
-        Returns:
-            LLM response
+        Stream with rate limiting.
+
+        The request only starts on the first next(), so the retried
+        callable opens the stream AND pulls the first chunk: a token is
+        acquired per attempt and a 429 raised at iteration start goes
+        through the same backoff/retry as invoke(). Later chunks are
+        yielded as they arrive.
         """
-        if self.rate_limiter:
-            # Wrap the synchronous invoke in an async function
-            def _call_llm():
-                return self.llm.invoke(messages, **kwargs)
-            
-            return await self.rate_limiter.call_with_retry(_call_llm)
-        else:
-            # No rate limiter, call directly
-            return self.llm.invoke(messages, **kwargs)
-    
+        if not self.rate_limiter:
+            return self.llm.stream(messages, **kwargs)
+
+        def _open_stream():
+            iterator = self.llm.stream(messages, **kwargs)
+            try:
+                first_chunk = next(iterator)
+            except StopIteration:
+                return iter(())
+            return chain((first_chunk,), iterator)
+
+        return self.rate_limiter.call_with_retry_sync(_open_stream)
+
+    def batch(self, inputs: list, config: Any = None, **kwargs) -> list:
+        """
+        Batch with rate limiting.
+
+        A batch of N prompts counts as N requests against the token
+        bucket: call_with_retry_sync acquires one token itself, the
+        remaining N-1 are taken here before the client fans out.
+        """
+        if not self.rate_limiter:
+            return self.llm.batch(inputs, config=config, **kwargs)
+
+        for _ in range(max(0, len(inputs) - 1)):
+            self.rate_limiter.acquire_sync()
+
+        def _call_batch():
+            return self.llm.batch(inputs, config=config, **kwargs)
+
+        return self.rate_limiter.call_with_retry_sync(_call_batch)
+
+    async def ainvoke(self, messages: list[BaseMessage], **kwargs) -> Any:
+        """
+        Async invoke with rate limiting, via the limiter's async path.
+        """
+        if not self.rate_limiter:
+            return await self.llm.ainvoke(messages, **kwargs)
+
+        async def _call_llm():
+            return await self.llm.ainvoke(messages, **kwargs)
+
+        return await self.rate_limiter.call_with_retry(_call_llm)
+
     def __getattr__(self, name: str) -> Any:
         """
         Delegate all other attributes to the wrapped LLM.
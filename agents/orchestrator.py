@@ -8,6 +8,7 @@ Workflow:
 4. Return final result
 """
 
+from functools import lru_cache
 from typing import List, Dict, Optional, Any, Tuple
 from langchain_openai import ChatOpenAI
 
@@ -20,6 +21,30 @@ from .initializer_agent import InitializerAgent
 from .code_executor_agent import CodeExecutorAgent
 
 
+@lru_cache(maxsize=8)
+def _make_refiner_llm(
+    model: str,
+    api_key: Optional[str],
+    base_url: Optional[str],
+    max_tokens: Optional[int],
+) -> ChatOpenAI:
+    """
+    Shared temperature-0 client for the refiner.
+
+    ChatOpenAI construction is expensive (httpx client, TLS context,
+    pydantic validation); memoizing on the connection parameters lets
+    per-request orchestrators reuse one client and its connection pool.
+    The client is stateless, so sharing across instances is safe.
+    """
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        base_url=base_url,
+        temperature=0.0,
+        max_tokens=max_tokens,
+    )
+
+
 class MultiAgentOrchestrator:
     """
     Coordinates the workflow of multiple agents.
@@ -64,12 +89,15 @@ class MultiAgentOrchestrator:
         # Refiner uses temperature=0 for precise corrections
         from .llm_wrapper import wrap_llm_with_rate_limiting
         
-        refiner_llm_base = ChatOpenAI(
-            model=llm.model_name,
-            api_key=llm.openai_api_key,
-            base_url=llm.openai_api_base if hasattr(llm, 'openai_api_base') else None,
-            temperature=0.0,
-            max_tokens=llm.max_tokens,
+        api_key = llm.openai_api_key
+        if hasattr(api_key, "get_secret_value"):
+            # SecretStr is not a stable cache key; hash the plain value
+            api_key = api_key.get_secret_value()
+        refiner_llm_base = _make_refiner_llm(
+            llm.model_name,
+            api_key,
+            llm.openai_api_base if hasattr(llm, 'openai_api_base') else None,
+            llm.max_tokens,
         )
         refiner_llm = wrap_llm_with_rate_limiting(refiner_llm_base)
         self.refiner = RefinerAgent(refiner_llm)
@@ -300,10 +328,16 @@ class MultiAgentOrchestrator:
         iteration = 0
         solver_output_raw = ""
         error_report = None
-        
+
+        # Constraints are fixed for the whole retry loop; extract the
+        # variable set once and share it with every verification.
+        constraint_vars = self.heap_solver_verifier._extract_variables_from_constraints(
+            constraints
+        )
+
         while iteration <= self.max_retries:
             iteration += 1
-            
+
             if iteration == 1:
                 # First iteration: use heap_solver
                 solver_output, solver_output_raw, solver_log = self.heap_solver.solve(
@@ -334,6 +368,7 @@ class MultiAgentOrchestrator:
                 constraints=constraints,
                 heap_solver_output=solver_output,
                 type_solver_output=type_solver_output,
+                variables=constraint_vars,
             )
             
             if error_report["is_well_formed"]:
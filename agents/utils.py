@@ -10,6 +10,13 @@ import re
 from typing import Any, Optional, Tuple, List
 from json import JSONDecodeError
 
+try:
+    # C serializer; roughly an order of magnitude faster than stdlib on
+    # the large initialization plans fed into prompts.
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def extract_first_json(text: str) -> Tuple[Optional[Any], Optional[str]]:
     """
@@ -70,3 +77,46 @@ def extract_first_json(text: str) -> Tuple[Optional[Any], Optional[str]]:
                     continue
     
     return None, None
+
+
+def compact_json(obj: Any, *, sort_keys: bool = True) -> str:
+    """
+    Serialize an object for an LLM prompt with minimal tokens.
+
+    Recursively drops keys whose value is an empty dict/list or None
+    (empty plan fields carry no information for the model) and emits
+    the result without indentation or separator whitespace. Keys are
+    sorted by default so semantically identical payloads serialize
+    identically, which keeps LLM-cache keys stable.
+
+    Args:
+        obj: JSON-serializable object
+        sort_keys: Sort dict keys in the output (default True)
+
+    Returns:
+        Compact JSON string
+    """
+
+    def _compact(value: Any) -> Any:
+        if isinstance(value, dict):
+            out = {}
+            for k, v in value.items():
+                v = _compact(v)
+                if v is None or v == {} or v == []:
+                    continue
+                out[k] = v
+            return out
+        if isinstance(value, list):
+            return [_compact(v) for v in value]
+        return value
+
+    compacted = _compact(obj)
+    if orjson is not None:
+        # orjson output is already compact and UTF-8 (no ASCII escaping),
+        # matching the stdlib call below byte for byte on plan payloads.
+        return orjson.dumps(
+            compacted, option=orjson.OPT_SORT_KEYS if sort_keys else 0
+        ).decode("utf-8")
+    return json.dumps(
+        compacted, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys
+    )
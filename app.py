@@ -200,8 +200,9 @@ async def _solve_internal(req: SolveRequest):
     if BASE_URL:
         llm_kwargs["base_url"] = BASE_URL
     
-    from agents.llm_wrapper import wrap_llm_with_rate_limiting
+    from agents.llm_wrapper import wrap_llm_with_rate_limiting, configure_llm_cache
     
+    configure_llm_cache()
     base_llm = ChatOpenAI(**llm_kwargs)
     llm = wrap_llm_with_rate_limiting(base_llm)
     logger.info(f"[INIT] LLM initialized - model: {model}, temperature: {llm_kwargs['temperature']}, max_tokens: {llm_kwargs['max_tokens']}")
@@ -335,8 +336,9 @@ async def initialize(req: GenerateInitialValuesRequest):
     if BASE_URL:
         llm_kwargs["base_url"] = BASE_URL
     
-    from agents.llm_wrapper import wrap_llm_with_rate_limiting
+    from agents.llm_wrapper import wrap_llm_with_rate_limiting, configure_llm_cache
     
+    configure_llm_cache()
     base_llm = ChatOpenAI(**llm_kwargs)
     llm = wrap_llm_with_rate_limiting(base_llm)
     logger.info(f"[INIT] LLM initialized - model: {model}, temperature: {req.temperature}")
@@ -48,3 +48,27 @@ API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
 # Enable API rate limiting (set to "false" to disable)
 API_RATE_LIMITING_ENABLED = os.getenv("API_RATE_LIMITING_ENABLED", "true").lower() == "true"
 
+# On-disk cache of parsed Java type metadata (javaUtils CLI results).
+# Type info is fully determined by (classpath, class name), so repeat runs
+# skip the JVM launches entirely.
+TYPE_INFO_CACHE_ENABLED = os.getenv("TYPE_INFO_CACHE_ENABLED", "true").lower() == "true"
+# Directory holding one cache file per classpath hash
+TYPE_INFO_CACHE_DIR = os.getenv(
+    "TYPE_INFO_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "llm-hlconstraints-solver"),
+)
+
+# Opt-in in-process memo of LLM responses inside RateLimitedLLM, keyed on
+# the exact messages and sampling parameters. Complements the SQLite cache
+# below: it also skips the rate-limiter wait and works without
+# langchain_community. Off by default because it returns byte-identical
+# completions for repeat prompts even at temperature > 0.
+LLM_RESPONSE_CACHE_ENABLED = os.getenv("LLM_RESPONSE_CACHE", "0") == "1"
+
+# LLM response caching configuration
+# Caches completions keyed on the exact prompt, so repeat prompts across
+# test iterations return instantly and spend no tokens.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+# SQLite database file used for the cache
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".langchain_cache.db")
+
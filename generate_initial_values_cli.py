@@ -68,6 +68,9 @@ def main():
     if BASE_URL:
         llm_kwargs["base_url"] = BASE_URL
     
+    from agents.llm_wrapper import configure_llm_cache
+
+    configure_llm_cache()
     llm = ChatOpenAI(**llm_kwargs)
     
     # Initialize agent
@@ -0,0 +1,224 @@
+package javaUtils;
+
+import javax.tools.FileObject;
+import javax.tools.ForwardingJavaFileManager;
+import javax.tools.JavaCompiler;
+import javax.tools.JavaFileManager;
+import javax.tools.JavaFileObject;
+import javax.tools.SimpleJavaFileObject;
+import javax.tools.StandardJavaFileManager;
+import javax.tools.ToolProvider;
+import java.io.BufferedInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.io.PrintWriter;
+import java.io.StringWriter;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URI;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+/**
+ * Long-lived worker JVM for compiling and executing generated Java snippets.
+ *
+ * Spawning a fresh javac + java process per snippet pays two JVM cold starts;
+ * this daemon is started once and amortizes that cost across all executions.
+ *
+ * Protocol (length-prefixed frames over stdin/stdout; stderr stays free for
+ * daemon diagnostics):
+ *   Request:  &lt;className&gt;\n &lt;sourceByteLength&gt;\n &lt;sourceBytes&gt;
+ *   Reply:    &lt;status&gt;\n &lt;stdoutByteLength&gt;\n &lt;stdoutBytes&gt; &lt;stderrByteLength&gt;\n &lt;stderrBytes&gt;
+ * where status is OK, COMPILE_ERROR or RUNTIME_ERROR.
+ *
+ * Compilation happens fully in memory via javax.tools; compiled classes are
+ * loaded by a throwaway ClassLoader so repeated snippets reusing a class name
+ * never clash.
+ */
+public class CodeExecutorDaemon {
+
+    private static final JavaCompiler COMPILER = ToolProvider.getSystemJavaCompiler();
+
+    // Reused across requests: only the thin per-request forwarding manager
+    // (which captures the per-snippet class-bytes map) is allocated per call.
+    private static final StandardJavaFileManager STANDARD_FILE_MANAGER =
+            COMPILER == null ? null : COMPILER.getStandardFileManager(null, null, StandardCharsets.UTF_8);
+
+    public static void main(String[] args) throws IOException {
+        if (COMPILER == null) {
+            System.err.println("No system Java compiler available (JRE instead of JDK?)");
+            System.exit(1);
+        }
+        BufferedInputStream in = new BufferedInputStream(System.in);
+        PrintStream realOut = System.out;
+        while (true) {
+            String className = readLine(in);
+            if (className == null) {
+                return; // parent closed stdin
+            }
+            byte[] source = readFrame(in);
+            if (source == null) {
+                return;
+            }
+            String status;
+            String stdout = "";
+            String stderr = "";
+            try {
+                Result result = compileAndRun(className.trim(), new String(source, StandardCharsets.UTF_8));
+                status = result.status;
+                stdout = result.stdout;
+                stderr = result.stderr;
+            } catch (Throwable t) {
+                status = "RUNTIME_ERROR";
+                stderr = stackTraceOf(t);
+            }
+            writeReply(realOut, status, stdout, stderr);
+        }
+    }
+
+    private static class Result {
+        final String status;
+        final String stdout;
+        final String stderr;
+
+        Result(String status, String stdout, String stderr) {
+            this.status = status;
+            this.stdout = stdout;
+            this.stderr = stderr;
+        }
+    }
+
+    private static Result compileAndRun(String className, final String source) throws Exception {
+        final Map<String, ByteArrayOutputStream> classBytes = new HashMap<String, ByteArrayOutputStream>();
+        JavaFileManager fileManager = new ForwardingJavaFileManager<JavaFileManager>(STANDARD_FILE_MANAGER) {
+            @Override
+            public JavaFileObject getJavaFileForOutput(Location location, String name,
+                                                       JavaFileObject.Kind kind, FileObject sibling) {
+                final ByteArrayOutputStream bytes = new ByteArrayOutputStream();
+                classBytes.put(name, bytes);
+                return new SimpleJavaFileObject(
+                        URI.create("mem:///" + name.replace('.', '/') + kind.extension), kind) {
+                    @Override
+                    public OutputStream openOutputStream() {
+                        return bytes;
+                    }
+                };
+            }
+        };
+
+        JavaFileObject sourceFile = new SimpleJavaFileObject(
+                URI.create("string:///" + className + ".java"), JavaFileObject.Kind.SOURCE) {
+            @Override
+            public CharSequence getCharContent(boolean ignoreEncodingErrors) {
+                return source;
+            }
+        };
+
+        StringWriter diagnostics = new StringWriter();
+        List<String> options = Arrays.asList("-classpath", System.getProperty("java.class.path"));
+        boolean compiled = COMPILER.getTask(
+                new PrintWriter(diagnostics), fileManager, null, options, null,
+                Collections.singletonList(sourceFile)).call();
+        // Flush, but do not close: close() would propagate to the shared
+        // StandardJavaFileManager and drop its caches.
+        fileManager.flush();
+        if (!compiled) {
+            return new Result("COMPILE_ERROR", "", diagnostics.toString());
+        }
+
+        // Throwaway loader: each snippet gets fresh class definitions
+        ClassLoader loader = new ClassLoader(CodeExecutorDaemon.class.getClassLoader()) {
+            @Override
+            protected Class<?> findClass(String name) throws ClassNotFoundException {
+                ByteArrayOutputStream bytes = classBytes.get(name);
+                if (bytes == null) {
+                    throw new ClassNotFoundException(name);
+                }
+                byte[] raw = bytes.toByteArray();
+                return defineClass(name, raw, 0, raw.length);
+            }
+        };
+
+        Class<?> mainClass = Class.forName(className, true, loader);
+        Method mainMethod = mainClass.getDeclaredMethod("main", String[].class);
+
+        // Capture the snippet's System.out / System.err during execution
+        ByteArrayOutputStream outCapture = new ByteArrayOutputStream();
+        ByteArrayOutputStream errCapture = new ByteArrayOutputStream();
+        PrintStream savedOut = System.out;
+        PrintStream savedErr = System.err;
+        System.setOut(new PrintStream(outCapture, true, "UTF-8"));
+        System.setErr(new PrintStream(errCapture, true, "UTF-8"));
+        try {
+            mainMethod.invoke(null, (Object) new String[0]);
+        } catch (InvocationTargetException e) {
+            Throwable cause = e.getCause() != null ? e.getCause() : e;
+            return new Result("RUNTIME_ERROR",
+                    outCapture.toString("UTF-8"),
+                    errCapture.toString("UTF-8") + stackTraceOf(cause));
+        } finally {
+            System.out.flush();
+            System.err.flush();
+            System.setOut(savedOut);
+            System.setErr(savedErr);
+        }
+        return new Result("OK", outCapture.toString("UTF-8"), errCapture.toString("UTF-8"));
+    }
+
+    private static String stackTraceOf(Throwable t) {
+        StringWriter writer = new StringWriter();
+        t.printStackTrace(new PrintWriter(writer));
+        return writer.toString();
+    }
+
+    private static String readLine(BufferedInputStream in) throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = in.read()) != -1) {
+            if (b == '\n') {
+                return new String(line.toByteArray(), StandardCharsets.UTF_8);
+            }
+            line.write(b);
+        }
+        return line.size() > 0 ? new String(line.toByteArray(), StandardCharsets.UTF_8) : null;
+    }
+
+    private static byte[] readFrame(BufferedInputStream in) throws IOException {
+        String lengthLine = readLine(in);
+        if (lengthLine == null) {
+            return null;
+        }
+        int length = Integer.parseInt(lengthLine.trim());
+        byte[] payload = new byte[length];
+        int offset = 0;
+        while (offset < length) {
+            int read = in.read(payload, offset, length - offset);
+            if (read == -1) {
+                return null;
+            }
+            offset += read;
+        }
+        return payload;
+    }
+
+    private static void writeReply(PrintStream out, String status, String stdout, String stderr)
+            throws IOException {
+        byte[] outBytes = stdout.getBytes(StandardCharsets.UTF_8);
+        byte[] errBytes = stderr.getBytes(StandardCharsets.UTF_8);
+        out.print(status);
+        out.print('\n');
+        out.print(outBytes.length);
+        out.print('\n');
+        out.write(outBytes);
+        out.print(errBytes.length);
+        out.print('\n');
+        out.write(errBytes);
+        out.flush();
+    }
+}
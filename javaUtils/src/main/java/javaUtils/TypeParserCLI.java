@@ -6,18 +6,32 @@ import java.util.*;
 /**
  * Command-line interface for TypeParseService
  * Usage: java -cp javautils-0.1.0-SNAPSHOT.jar javaUtils.TypeParserCLI <classname> [classpath]
+ *        java -cp javautils-0.1.0-SNAPSHOT.jar javaUtils.TypeParserCLI --batch <name1,name2,...> [classpath]
+ *
+ * Batch mode parses all names in one JVM with a single Soot initialization
+ * and prints a JSON object mapping each name to its TypeInfoJson (or null).
  */
 public class TypeParserCLI {
-    
+
     public static void main(String[] args) {
         if (args.length < 1) {
             System.err.println("Usage: java javaUtils.TypeParserCLI <classname> [classpath]");
+            System.err.println("       java javaUtils.TypeParserCLI --batch <name1,name2,...> [classpath]");
             System.exit(1);
         }
-        
+
+        if ("--batch".equals(args[0])) {
+            if (args.length < 2) {
+                System.err.println("Usage: java javaUtils.TypeParserCLI --batch <name1,name2,...> [classpath]");
+                System.exit(1);
+            }
+            runBatch(args[1], args.length > 2 ? args[2] : "");
+            return;
+        }
+
         String typeSignature = args[0];
         String classpath = args.length > 1 ? args[1] : "";
-        
+
         try {
             initSoot(classpath);
             TypeInfoJson result = TypeParseService.parseTypeInfo(typeSignature);
@@ -35,6 +49,42 @@ public class TypeParserCLI {
         }
     }
     
+    private static void runBatch(String joinedNames, String classpath) {
+        try {
+            initSoot(classpath);
+        } catch (Exception e) {
+            System.err.println("Error: " + e.getMessage());
+            e.printStackTrace(System.err);
+            System.exit(1);
+        }
+
+        StringBuilder sb = new StringBuilder();
+        sb.append('{');
+        boolean first = true;
+        for (String name : joinedNames.split(",")) {
+            name = name.trim();
+            if (name.isEmpty()) {
+                continue;
+            }
+            if (!first) {
+                sb.append(',');
+            }
+            first = false;
+            sb.append('"').append(name.replace("\\", "\\\\").replace("\"", "\\\"")).append("\":");
+            TypeInfoJson result = null;
+            try {
+                result = TypeParseService.parseTypeInfo(name);
+            } catch (Exception e) {
+                // Unresolvable names are reported as null so one bad entry
+                // does not fail the whole batch.
+                System.err.println("Failed to parse type: " + name);
+            }
+            sb.append(result != null ? result.toJson() : "null");
+        }
+        sb.append('}');
+        System.out.println(sb);
+    }
+
     private static void initSoot(String classpath) {
         soot.G.reset();
         soot.options.Options.v().set_prepend_classpath(true);
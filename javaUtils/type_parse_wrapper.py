@@ -3,12 +3,19 @@ Python wrapper for Java Type Parse Service via CLI.
 Provides easy-to-use Python interface for calling the Java type parsing utilities.
 """
 
+import hashlib
 import json
 import subprocess
 import os
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional
-from config import JAVA_UTILS_PATH, CLASS_PATH
+from config import (
+    JAVA_UTILS_PATH,
+    CLASS_PATH,
+    TYPE_INFO_CACHE_ENABLED,
+    TYPE_INFO_CACHE_DIR,
+)
 
 
 class TypeInfo:
@@ -172,13 +179,46 @@ class TypeParseServiceWrapper:
             print(f"Error: {e}")
             return None
     
+    def parse_type_infos(self, type_signatures: List[str]) -> Dict[str, Optional[TypeInfo]]:
+        """
+        Parse several types in a single JVM launch via the CLI's --batch mode.
+
+        Each parse_type_info call pays the full Soot initialization, so
+        batching N names into one subprocess amortizes that startup cost.
+        Falls back to per-name calls when batch mode is unavailable
+        (e.g. a CLI jar built before --batch existed).
+        """
+        names = [n for n in dict.fromkeys(type_signatures) if n]
+        if not names:
+            return {}
+        if len(names) == 1:
+            return {names[0]: self.parse_type_info(names[0])}
+        try:
+            cmd = [
+                'java',
+                '-cp', self.cli_jar,
+                'javaUtils.TypeParserCLI',
+                '--batch', ','.join(names),
+                self.classpath
+            ]
+            result = subprocess.run(
+                cmd, capture_output=True, text=True, timeout=30 + 10 * len(names)
+            )
+            if result.returncode == 0:
+                data = json.loads(result.stdout.strip())
+                return {n: (TypeInfo(v) if v else None) for n, v in data.items()}
+            print(f"Batch parse failed, falling back to per-name calls: {result.stderr.strip()[:200]}")
+        except json.JSONDecodeError as e:
+            print(f"JSON parse error in batch output: {e}")
+        except subprocess.TimeoutExpired:
+            print(f"Timeout batch-parsing {len(names)} types")
+        except Exception as e:
+            print(f"Error: {e}")
+        return {n: self.parse_type_info(n) for n in names}
+
     def parse_multiple_types(self, type_signatures: List[str]) -> Dict[str, TypeInfo]:
-        result = {}
-        for type_sig in type_signatures:
-            type_info = self.parse_type_info(type_sig)
-            if type_info:
-                result[type_sig] = type_info
-        return result
+        parsed = self.parse_type_infos(type_signatures)
+        return {sig: info for sig, info in parsed.items() if info}
     
     def get_constructors(self, type_signature: str) -> List[str]:
         type_info = self.parse_type_info(type_signature)
@@ -206,6 +246,114 @@ class TypeParseServiceWrapper:
         return []
 
 
+@lru_cache(maxsize=8)
+def get_shared_service(classpath: Optional[str]) -> TypeParseServiceWrapper:
+    """
+    One wrapper per distinct classpath, shared by all cached lookups and
+    by agent instances. The wrapper holds no mutable state after
+    construction (each call spawns its own subprocess), so sharing it
+    across threads is safe.
+    """
+    return TypeParseServiceWrapper(classpath=classpath)
+
+
+# Memo for parse_type_info_cached / parse_type_infos_cached, keyed on
+# (classpath, type signature). A plain dict rather than lru_cache so the
+# bulk path can seed many entries from one subprocess. Type metadata is
+# static for a given classpath, so entries never expire.
+_type_info_cache: Dict[tuple, Optional[TypeInfo]] = {}
+
+# Classpaths whose on-disk cache file has already been loaded this process.
+_disk_cache_loaded: set = set()
+
+
+def _disk_cache_path(classpath: Optional[str]) -> str:
+    digest = hashlib.sha1((classpath or "").encode()).hexdigest()[:16]
+    return os.path.join(TYPE_INFO_CACHE_DIR, f"typeinfo-{digest}.jsonl")
+
+
+def _load_disk_cache(classpath: Optional[str]) -> None:
+    """
+    Seed the in-memory cache from the per-classpath JSON-lines file, once
+    per process. Type metadata only depends on (classpath, class name),
+    so across runs this turns every previously seen lookup into a local
+    read instead of a JVM launch. Best effort: a missing or partly
+    written file just means fewer seeds.
+    """
+    if not TYPE_INFO_CACHE_ENABLED or classpath in _disk_cache_loaded:
+        return
+    _disk_cache_loaded.add(classpath)
+    try:
+        with open(_disk_cache_path(classpath), "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write from an interrupted run
+                name = entry.get("name")
+                data = entry.get("data")
+                if name and data:
+                    _type_info_cache.setdefault((classpath, name), TypeInfo(data))
+    except OSError:
+        pass  # no cache file yet
+
+
+def _store_disk_cache(classpath: Optional[str], name: str, info: Optional[TypeInfo]) -> None:
+    """
+    Append one freshly parsed entry to the per-classpath cache file.
+    Unresolved names (None) are not persisted so classes compiled after
+    this run are picked up next time.
+    """
+    if not TYPE_INFO_CACHE_ENABLED or info is None:
+        return
+    path = _disk_cache_path(classpath)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"name": name, "data": info.to_dict()}) + "\n")
+    except OSError:
+        pass  # best effort
+
+
+def parse_type_info_cached(classpath: Optional[str], type_signature: str) -> Optional[TypeInfo]:
+    """
+    Memoized parse_type_info keyed on (classpath, type signature).
+
+    Every uncached call launches a JVM subprocess, and the same types
+    (java.util.ArrayList, java.lang.String, ...) recur in almost every
+    method the agents process, so hits eliminate the dominant per-type
+    cost. The classpath is part of the key because it changes what Soot
+    can resolve.
+    """
+    _load_disk_cache(classpath)
+    key = (classpath, type_signature)
+    if key not in _type_info_cache:
+        info = get_shared_service(classpath).parse_type_info(type_signature)
+        _type_info_cache[key] = info
+        _store_disk_cache(classpath, type_signature, info)
+    return _type_info_cache[key]
+
+
+def parse_type_infos_cached(
+    classpath: Optional[str], type_signatures: List[str]
+) -> Dict[str, Optional[TypeInfo]]:
+    """
+    Memoized bulk lookup: resolves all still-uncached names with one
+    --batch subprocess (single Soot initialization) and seeds the shared
+    cache, so later parse_type_info_cached calls for the same names hit.
+    """
+    _load_disk_cache(classpath)
+    names = [n for n in dict.fromkeys(type_signatures) if n]
+    pending = [n for n in names if (classpath, n) not in _type_info_cache]
+    if pending:
+        results = get_shared_service(classpath).parse_type_infos(pending)
+        for name in pending:
+            info = results.get(name)
+            _type_info_cache[(classpath, name)] = info
+            _store_disk_cache(classpath, name, info)
+    return {n: _type_info_cache[(classpath, n)] for n in names}
+
+
 if __name__ == "__main__":
     service = TypeParseServiceWrapper()
     type_info = service.parse_type_info("java.util.ArrayList")